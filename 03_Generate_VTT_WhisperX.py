@@ -4,6 +4,7 @@ import gc
 import sqlite3
 import os
 import time
+from vtt_io import write_vtt, seconds_to_ms
 
 # Important detail, this was the initial PoC
 # The sqlite is not going to be used for long term.
@@ -48,16 +49,10 @@ for row in rows:
 
         # 3. Generate VTT
         def generate_vtt(result, output_file):
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("WEBVTT\n\n")
-                
-                for i, segment in enumerate(result["segments"]):
-                    start_time = format_time(segment["start"])
-                    end_time = format_time(segment["end"])
-                    text = segment["text"].strip()                    
-                    
-                    f.write(f"{start_time} --> {end_time}\n")
-                    f.write(f"{text}\n\n")
+            write_vtt(output_file, (
+                (seconds_to_ms(segment["start"]), seconds_to_ms(segment["end"]), segment["text"].strip())
+                for segment in result["segments"]
+            ))
 
         # 4. Generate Text File
         def generate_text(result, output_file):
@@ -66,13 +61,6 @@ for row in rows:
                     text = segment["text"].strip()
                     f.write(f"{text}\n")
 
-        def format_time(seconds):
-            """Convert seconds to VTT time format (HH:MM:SS.mmm)"""
-            hours = int(seconds // 3600)
-            minutes = int((seconds % 3600) // 60)
-            seconds = seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
-
         # Generate the VTT file        
         generate_vtt(result, output_vtt_file)
         
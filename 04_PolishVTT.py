@@ -1,5 +1,9 @@
 import sqlite3
 import os
+import sys
+import json
+from multiprocessing import Pool
+from vtt_io import iter_cues
 
 # Important detail, this was the initial PoC
 # The sqlite is not going to be used for long term.
@@ -7,68 +11,150 @@ import os
 # Replace 'your_database.db' with your SQLite database file name
 database_file = 'file_data.db'
 
-# Establish a connection to the SQLite database
-connection = sqlite3.connect(database_file)
-cursor = connection.cursor()
-
-cursor.execute("SELECT * FROM files WHERE full_path LIKE '%DEFCON%'")
-matching_files = cursor.fetchall()
-
-row_count = len(matching_files) + 0
-
-# Close the database connection
-connection.close()
-
-files_processed = 0
-
-files = []
-for row in matching_files:
-    id, full_path, filename, extension, for_processing = row
-    input_file = full_path
-    # print(f"Processing file: {full_path}")
-    current_folder = os.path.dirname(full_path)
-    # print(current_folder)
-    filename = os.path.basename(full_path)
-    # print(filename)
-    file_name_without_extension = os.path.splitext(os.path.basename(filename))[0]
-    
-    files_processed = files_processed + 1
-    print(f'Files Processed: {files_processed}/{row_count}')
-    print("\n")
-    output_audio_file_wav = os.path.join(current_folder, file_name_without_extension +'.wav')
-    output_vtt_file = os.path.join(current_folder, file_name_without_extension + '.vtt')
-    
-    if os.path.exists(output_vtt_file):        
-        try:
-            # Add to the file list
+# Subtitle QA limits
+QA_LIMITS = {
+    'max_chars': 120,         # Whole cue text
+    'max_line_chars': 84,     # Any single line of a cue
+    'max_cps': 25.0,          # Characters per second
+    'min_duration_ms': 700,
+    'max_duration_ms': 10000,
+    'max_gap_ms': 10000,      # Silence between consecutive cues worth a look
+}
+
+# Issue examples kept per rule and file in the report
+MAX_EXAMPLES = 5
+
+
+def find_vtt_files(database_file, path_filter='%DEFCON%'):
+    """Return the VTT files that exist next to the registered videos"""
+    # Establish a connection to the SQLite database
+    connection = sqlite3.connect(database_file)
+    cursor = connection.cursor()
+
+    cursor.execute("SELECT * FROM files WHERE full_path LIKE ?", (path_filter,))
+    matching_files = cursor.fetchall()
+
+    # Close the database connection
+    connection.close()
+
+    files = []
+    for row in matching_files:
+        id, full_path, filename, extension, for_processing = row
+        current_folder = os.path.dirname(full_path)
+        file_name_without_extension = os.path.splitext(os.path.basename(full_path))[0]
+        output_vtt_file = os.path.join(current_folder, file_name_without_extension + '.vtt')
+
+        if os.path.exists(output_vtt_file):
             files.append(output_vtt_file)
-            
-            # Reporting to console
-            print(f'File Identified: {id}')
-        except:
-            print(f"Error on processing videoId: {id}")
-
-
-
-def has_long_subtitles(vtt_file, max_chars=120):
-    """Returns True if any subtitle content > max_chars"""
-    with open(vtt_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Extract all subtitle text (everything after timestamp lines)
-    import re
-    blocks = re.split(r'\n\s*\n', content)
-    
-    for block in blocks:
-        lines = block.strip().split('\n')
-        # Find content after timestamp
-        for i, line in enumerate(lines):
-            if '-->' in line and i + 1 < len(lines):
-                subtitle_text = ' '.join(lines[i+1:]).strip()
-                if len(subtitle_text) > max_chars:
-                    return True
-    return False
-
-            
-for file in files:
-    print(f"{file}: {'🚩 TOO LONG' if has_long_subtitles(file) else '✅ OK'}")
\ No newline at end of file
+
+    print(f'Files Identified: {len(files)}/{len(matching_files)}')
+    return files
+
+
+def check_vtt(vtt_file, limits=QA_LIMITS):
+    """
+    Run every QA rule over one VTT file in a single streaming pass
+
+    Returns a dict with the cue count, issue counts per rule and a few
+    examples per rule (cue number, start in ms and the offending value).
+    """
+    issues = {}
+    examples = {}
+
+    def flag(rule, cue_number, start_ms, value):
+        issues[rule] = issues.get(rule, 0) + 1
+        rule_examples = examples.setdefault(rule, [])
+        if len(rule_examples) < MAX_EXAMPLES:
+            rule_examples.append({'cue': cue_number, 'start_ms': start_ms, 'value': value})
+
+    cue_count = 0
+    previous_end = None
+    try:
+        with open(vtt_file, 'r', encoding='utf-8', errors='replace') as f:
+            for cue_count, (start_ms, end_ms, text) in enumerate(iter_cues(f), 1):
+                duration = end_ms - start_ms
+                text_length = len(text) - text.count('\n')
+
+                if not text:
+                    flag('empty', cue_count, start_ms, 0)
+                if duration <= 0:
+                    flag('non_positive_duration', cue_count, start_ms, duration)
+                elif duration < limits['min_duration_ms']:
+                    flag('short_duration', cue_count, start_ms, duration)
+                elif duration > limits['max_duration_ms']:
+                    flag('long_duration', cue_count, start_ms, duration)
+
+                if text_length > limits['max_chars']:
+                    flag('long_text', cue_count, start_ms, text_length)
+                longest_line = max(len(line) for line in text.split('\n'))
+                if longest_line > limits['max_line_chars']:
+                    flag('long_line', cue_count, start_ms, longest_line)
+                if duration > 0:
+                    cps = text_length * 1000 / duration
+                    if cps > limits['max_cps']:
+                        flag('high_cps', cue_count, start_ms, round(cps, 1))
+
+                if previous_end is not None:
+                    gap = start_ms - previous_end
+                    if gap < 0:
+                        flag('overlap', cue_count, start_ms, -gap)
+                    elif gap > limits['max_gap_ms']:
+                        flag('long_gap', cue_count, start_ms, gap)
+                previous_end = end_ms
+    except OSError as e:
+        return {'file': vtt_file, 'error': str(e)}
+
+    if cue_count == 0:
+        flag('no_cues', 0, 0, 0)
+
+    return {'file': vtt_file, 'cues': cue_count, 'issues': issues, 'examples': examples}
+
+
+def run_qa(files, report_file='vtt_qa_report.jsonl', workers=None):
+    """
+    Check all files across a process pool, writing one JSON line per file
+    as results arrive
+
+    Returns the issue totals per rule.
+    """
+    totals = {}
+    flagged = 0
+
+    with open(report_file, 'w', encoding='utf-8') as report, Pool(workers) as pool:
+        for result in pool.imap_unordered(check_vtt, files, chunksize=16):
+            report.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+            if 'error' in result:
+                print(f"{result['file']}: ❌ {result['error']}")
+                continue
+            for rule, count in result['issues'].items():
+                totals[rule] = totals.get(rule, 0) + count
+            if result['issues']:
+                flagged += 1
+                summary = ', '.join(f"{rule}={count}" for rule, count in sorted(result['issues'].items()))
+                print(f"{result['file']}: 🚩 {summary}")
+            else:
+                print(f"{result['file']}: ✅ OK")
+
+    print(f"\nChecked {len(files)} files, {flagged} with issues. Report: {report_file}")
+    for rule, count in sorted(totals.items()):
+        print(f"  {rule}: {count}")
+    return totals
+
+
+if __name__ == "__main__":
+    # Usage: python 04_PolishVTT.py [file.vtt ...] [--report <path>] [--workers <n>]
+    args = sys.argv[1:]
+    report_file = 'vtt_qa_report.jsonl'
+    workers = None
+    if '--report' in args:
+        idx = args.index('--report')
+        report_file = args[idx + 1]
+        del args[idx:idx + 2]
+    if '--workers' in args:
+        idx = args.index('--workers')
+        workers = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    files = args if args else find_vtt_files(database_file)
+    run_qa(files, report_file, workers)
@@ -1,29 +1,183 @@
 import re
+import sys
+import json
 import time
-from typing import List, Dict
-from openai import OpenAI
+import random
+import asyncio
+from typing import List, Dict, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIStatusError, APIConnectionError
 import os
 import sqlite3
+from vtt_io import CueTable, parse_vtt, read_vtt, write_vtt
+from token_budget import TokenBudgetBatcher
 
 # Important detail, this was the initial PoC
 # The sqlite is not going to be used for long term.
 
+class RateLimiter:
+    """
+    Token bucket shared by concurrent requests, kept in sync with the
+    x-ratelimit-* headers returned by the OpenAI API
+    """
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 40000):
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self.available_requests = self.request_capacity
+        self.available_tokens = self.token_capacity
+        self.last_refill = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.available_requests = min(
+            self.request_capacity,
+            self.available_requests + elapsed * self.request_capacity / 60
+        )
+        self.available_tokens = min(
+            self.token_capacity,
+            self.available_tokens + elapsed * self.token_capacity / 60
+        )
+
+    async def acquire(self, tokens: int):
+        """
+        Wait until one request and the estimated tokens fit in the bucket
+        
+        Args:
+            tokens (int): Estimated prompt + completion tokens for the request
+        """
+        tokens = min(tokens, self.token_capacity)
+        while True:
+            async with self.lock:
+                self._refill()
+                if self.available_requests >= 1 and self.available_tokens >= tokens:
+                    self.available_requests -= 1
+                    self.available_tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self.available_requests) * 60 / self.request_capacity,
+                    (tokens - self.available_tokens) * 60 / self.token_capacity
+                )
+            await asyncio.sleep(max(wait, 0.05))
+
+    def update_from_headers(self, headers):
+        """
+        Adopt the server's view of our quota
+        
+        Args:
+            headers: Response headers containing x-ratelimit-* values
+        """
+        def header_float(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        limit_requests = header_float('x-ratelimit-limit-requests')
+        limit_tokens = header_float('x-ratelimit-limit-tokens')
+        remaining_requests = header_float('x-ratelimit-remaining-requests')
+        remaining_tokens = header_float('x-ratelimit-remaining-tokens')
+
+        self._refill()
+        if limit_requests:
+            self.request_capacity = limit_requests
+        if limit_tokens:
+            self.token_capacity = limit_tokens
+        if remaining_requests is not None:
+            self.available_requests = min(self.available_requests, remaining_requests)
+        if remaining_tokens is not None:
+            self.available_tokens = min(self.available_tokens, remaining_tokens)
+
+    def drain(self):
+        """Empty the bucket after a 429 so every pending request backs off"""
+        self._refill()
+        self.available_requests = 0
+        self.available_tokens = 0
+
+
+# Target languages: the prompt name and model used for each output.
+# Each language is written next to the source as <name>-<code>.vtt
+LANGUAGES = {
+    'en': {'name': 'English', 'model': 'gpt-4'},
+    'pt': {'name': 'Portuguese (Brazilian Portuguese)', 'model': 'gpt-3.5-turbo'},
+}
+
+
+# Per-model request budgets in tokens: total context window and the
+# completion budget reserved for the translated lines (sent as max_tokens)
+MODEL_BUDGETS = {
+    'gpt-4': {'context': 8192, 'output': 2000},
+    'gpt-3.5-turbo': {'context': 16385, 'output': 4096},
+}
+DEFAULT_BUDGET = {'context': 8192, 'output': 2000}
+
+
+def output_path_for(input_vtt_path: str, target_lang: str) -> str:
+    """
+    Build the translated VTT path for a source VTT (talk.vtt -> talk-en.vtt)
+    """
+    base, _ = os.path.splitext(input_vtt_path)
+    return f"{base}-{target_lang}.vtt"
+
+
 class VTTTranslator:
-    def __init__(self, api_key: str = None):
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 60.0
+    BATCH_API_MAX_REQUESTS = 50000  # OpenAI Batch API limit per input file
+    BATCH_TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+    BATCH_MAX_SUBMITS = 3  # Resends of a part's unanswered requests before giving up
+    PROMPT_OVERHEAD_TOKENS = 250  # instructions + system message
+
+    def __init__(self, api_key: str = None, base_url: str = None):
         """
         Initialize the VTT translator with OpenAI API key
         
         Args:
             api_key (str): OpenAI API key. If None, will look for OPENAI_API_KEY env variable
+            base_url (str): Alternative API endpoint, e.g. a local mock server for testing.
+                If None, the client uses OPENAI_BASE_URL or the official API
         """
         if api_key is None:
             api_key = os.getenv('OPENAI_API_KEY')
             if api_key is None:
                 raise ValueError("Please provide OpenAI API key or set OPENAI_API_KEY environment variable")
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        # Retries are handled by translate_batch_async, paced by the rate limiter;
+        # SDK retries on top would multiply them and bypass the token bucket
+        self.async_client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self.rate_limiter = RateLimiter()
+
+    def _budget(self, target_lang: str) -> Dict:
+        return MODEL_BUDGETS.get(LANGUAGES[target_lang]['model'], DEFAULT_BUDGET)
+
+    def make_batches(self, segments: CueTable, target_lang: str = 'en',
+                     batch_size: Optional[int] = None) -> List[CueTable]:
+        """
+        Group segments into request batches
+        
+        Args:
+            segments (CueTable): Segments from load_segments
+            target_lang (str): Key of LANGUAGES, selects the model budget
+            batch_size (Optional[int]): Fixed number of segments per batch;
+                None packs by estimated tokens up to the model budget
+            
+        Returns:
+            List[CueTable]: Batches of segments in order
+        """
+        if batch_size:
+            return [segments[i:i + batch_size] for i in range(0, len(segments), batch_size)]
+
+        budget = self._budget(target_lang)
+        batcher = TokenBudgetBatcher(budget['context'], budget['output'], self.PROMPT_OVERHEAD_TOKENS)
+        bounds = batcher.pack(segments.texts)
+        return [segments[start:end] for start, end in bounds]
         
-    def parse_vtt_segments(self, vtt_content: str) -> List[Dict]:
+    def parse_vtt_segments(self, vtt_content: str) -> CueTable:
         """
         Extract segments from VTT content
         
@@ -31,45 +185,9 @@ class VTTTranslator:
             vtt_content (str): Raw VTT file content
             
         Returns:
-            List[Dict]: List of segments with start, end, and text
+            CueTable: Segment start/end milliseconds and texts
         """
-        segments = []
-        lines = vtt_content.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Look for timestamp line (HH:MM:SS.mmm --> HH:MM:SS.mmm)
-            if '-->' in line:
-                timestamp_match = re.match(
-                    r'(\d{2}:\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3})',
-                    line
-                )
-                if timestamp_match:
-                    start_time = timestamp_match.group(1)
-                    end_time = timestamp_match.group(2)
-                    
-                    # Get subtitle text (next non-empty line(s))
-                    text_lines = []
-                    i += 1
-                    while i < len(lines) and lines[i].strip():
-                        # Remove speaker tags and HTML tags if present
-                        clean_line = re.sub(r'<[^>]+>', '', lines[i].strip())
-                        clean_line = re.sub(r'<v [^>]+>', '', clean_line)
-                        if clean_line:
-                            text_lines.append(clean_line)
-                        i += 1
-                    
-                    if text_lines:
-                        segments.append({
-                            'start': start_time,
-                            'end': end_time,
-                            'text': ' '.join(text_lines).strip()
-                        })
-            i += 1
-        
-        return segments
+        return parse_vtt(vtt_content, strip_tags=True, joiner=' ', skip_empty=True)
 
     def parse_translation_response(self, response_text: str) -> List[str]:
         """
@@ -94,24 +212,23 @@ class VTTTranslator:
         
         return translations
 
-    def translate_batch(self, spanish_texts: List[str], batch_number: int = 1) -> List[str]:
+    def _build_messages(self, spanish_texts: List[str], target_lang: str = 'en') -> List[Dict]:
         """
-        Translate a batch of Spanish texts to English
-        
+        Build the chat messages for a batch of Spanish texts
+
         Args:
             spanish_texts (List[str]): List of Spanish texts to translate
-            batch_number (int): Batch number for progress tracking
-            
+            target_lang (str): Key of LANGUAGES to translate into
+
         Returns:
-            List[str]: List of translated English texts
+            List[Dict]: Messages for the chat completions API
         """
-        print(f"Translating batch {batch_number} ({len(spanish_texts)} segments)...")
-        
         # Create numbered list of Spanish texts
         numbered_texts = [f"{i+1}. {text}" for i, text in enumerate(spanish_texts)]
         spanish_list = '\n'.join(numbered_texts)
+        language = LANGUAGES[target_lang]['name']
         
-        prompt = f"""Translate the following Spanish subtitle segments to natural English, maintaining:
+        prompt = f"""Translate the following Spanish subtitle segments to natural {language}, maintaining:
                     - Natural flow and timing appropriate for subtitles
                     - Cultural context and idioms (adapt when necessary)
                     - Speaker tone and emotional content
@@ -121,126 +238,567 @@ class VTTTranslator:
                     Spanish segments:
                     {spanish_list}
 
-                    Important: Provide ONLY the English translations, numbered the same way (1., 2., etc.). Do not include any other text or explanations."""
+                    Important: Provide ONLY the {language} translations, numbered the same way (1., 2., etc.). Do not include any other text or explanations."""
+
+        return [
+            {
+                "role": "system", 
+                "content": f"You are a professional subtitle translator specializing in Spanish to {language} translation. You understand cultural nuances and subtitle formatting requirements."
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ]
+
+    def _match_translations(self, response_text: str, spanish_texts: List[str]) -> List[str]:
+        """
+        Parse a response and align it one-to-one with the input texts
+        
+        Args:
+            response_text (str): Response from OpenAI
+            spanish_texts (List[str]): The texts that were sent
+            
+        Returns:
+            List[str]: Exactly len(spanish_texts) translations
+        """
+        translated_texts = self.parse_translation_response(response_text)
+        
+        # Ensure we have the same number of translations as inputs
+        if len(translated_texts) != len(spanish_texts):
+            print(f"Warning: Expected {len(spanish_texts)} translations, got {len(translated_texts)}")
+            # Pad with original texts if needed
+            while len(translated_texts) < len(spanish_texts):
+                translated_texts.append(spanish_texts[len(translated_texts)])
+        
+        return translated_texts[:len(spanish_texts)]  # Trim if too many
+
+    def translate_batch(self, spanish_texts: List[str], batch_number: int = 1, target_lang: str = 'en') -> List[str]:
+        """
+        Translate a batch of Spanish texts to the target language
+        
+        Args:
+            spanish_texts (List[str]): List of Spanish texts to translate
+            batch_number (int): Batch number for progress tracking
+            target_lang (str): Key of LANGUAGES to translate into
+            
+        Returns:
+            List[str]: List of translated texts
+        """
+        print(f"Translating batch {batch_number} [{target_lang}] ({len(spanish_texts)} segments)...")
 
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4",  # Use gpt-3.5-turbo for faster/cheaper option
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a professional subtitle translator specializing in Spanish to English translation. You understand cultural nuances and subtitle formatting requirements."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
+                model=LANGUAGES[target_lang]['model'],
+                messages=self._build_messages(spanish_texts, target_lang),
                 temperature=0.3,  # Low temperature for consistent translations
-                max_tokens=2000   # Adjust based on batch size
+                max_tokens=self._budget(target_lang)['output']
             )
             
-            # Parse the response
-            english_texts = self.parse_translation_response(response.choices[0].message.content)
-            
-            # Ensure we have the same number of translations as inputs
-            if len(english_texts) != len(spanish_texts):
-                print(f"Warning: Expected {len(spanish_texts)} translations, got {len(english_texts)}")
-                # Pad with original texts if needed
-                while len(english_texts) < len(spanish_texts):
-                    english_texts.append(spanish_texts[len(english_texts)])
-            
-            return english_texts[:len(spanish_texts)]  # Trim if too many
+            return self._match_translations(response.choices[0].message.content, spanish_texts)
             
         except Exception as e:
-            print(f"Error translating batch {batch_number}: {e}")
+            print(f"Error translating batch {batch_number} [{target_lang}]: {e}")
             print("Falling back to original Spanish text...")
             return spanish_texts  # Fallback to original text
 
-    def write_vtt_file(self, segments: List[Dict], output_path: str):
+    def write_vtt_file(self, segments: CueTable, output_path: str):
         """
         Write segments to VTT file
         
         Args:
-            segments (List[Dict]): List of segments with start, end, and text
+            segments (CueTable): Segment start/end milliseconds and texts
             output_path (str): Output file path
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("WEBVTT\n\n")
-            
-            for i, segment in enumerate(segments):
-                # Add sequence number for better compatibility
-                f.write(f"{i + 1}\n")
-                f.write(f"{segment['start']} --> {segment['end']}\n")
-                f.write(f"{segment['text']}\n\n")
+        # Sequence numbers are added for better compatibility
+        write_vtt(output_path, segments, numbered=True)
         
         print(f"Translated VTT file saved to: {output_path}")
 
-    def translate_vtt_file(self, input_vtt_path: str, output_vtt_path: str, batch_size: int = 10):
+    def load_segments(self, input_vtt_path: str) -> CueTable:
         """
-        Translate a Spanish VTT file to English
+        Read and parse a source VTT file once, for all target languages
         
         Args:
             input_vtt_path (str): Path to input Spanish VTT file
-            output_vtt_path (str): Path to output English VTT file
-            batch_size (int): Number of segments to translate in each API call
+            
+        Returns:
+            CueTable: Segment start/end milliseconds and texts
         """
         print(f"Reading VTT file: {input_vtt_path}")
         
-        # Read the VTT file
+        # Stream and parse the VTT file in one pass
         try:
-            with open(input_vtt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            segments = read_vtt(input_vtt_path, strip_tags=True, joiner=' ', skip_empty=True)
         except FileNotFoundError:
             raise FileNotFoundError(f"Input file not found: {input_vtt_path}")
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(input_vtt_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        
-        # Extract segments
-        segments = self.parse_vtt_segments(content)
         print(f"Found {len(segments)} subtitle segments")
         
         if not segments:
             raise ValueError("No subtitle segments found in the VTT file")
         
-        # Translate in batches
-        translated_segments = []
-        total_batches = (len(segments) + batch_size - 1) // batch_size
+        return segments
+
+    def translate_segments(self, segments: CueTable, target_lang: str = 'en',
+                           batch_size: Optional[int] = None) -> CueTable:
+        """
+        Translate already-parsed segments to one target language
         
-        for i in range(0, len(segments), batch_size):
-            batch = segments[i:i+batch_size]
-            batch_number = i // batch_size + 1
-            
-            spanish_texts = [seg['text'] for seg in batch]
+        Args:
+            segments (CueTable): Segments from load_segments
+            target_lang (str): Key of LANGUAGES to translate into
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
             
+        Returns:
+            CueTable: Translated segments with the source timings
+        """
+        translated_texts = []
+        batches = self.make_batches(segments, target_lang, batch_size)
+        total_batches = len(batches)
+        
+        for batch_number, batch in enumerate(batches, 1):
             # Translate batch
-            english_texts = self.translate_batch(spanish_texts, batch_number)
-            
-            # Update segments with translations
-            for j, english_text in enumerate(english_texts):
-                if i + j < len(segments):
-                    translated_segments.append({
-                        'start': batch[j]['start'],
-                        'end': batch[j]['end'], 
-                        'text': english_text
-                    })
+            translated_texts.extend(self.translate_batch(batch.texts, batch_number, target_lang))
             
             # Small delay between batches to respect rate limits
             if batch_number < total_batches:
                 time.sleep(1)
             
-            print(f"Completed batch {batch_number}/{total_batches}")
+            print(f"Completed batch {batch_number}/{total_batches} [{target_lang}]")
+        
+        return segments.with_texts(translated_texts)
+
+    def translate_vtt_file(self, input_vtt_path: str, output_vtt_path: str, batch_size: Optional[int] = None,
+                           target_lang: str = 'en'):
+        """
+        Translate a Spanish VTT file to a single target language
+        
+        Args:
+            input_vtt_path (str): Path to input Spanish VTT file
+            output_vtt_path (str): Path to output translated VTT file
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
+            target_lang (str): Key of LANGUAGES to translate into
+        """
+        self.translate_vtt_file_multi(input_vtt_path, {target_lang: output_vtt_path}, batch_size)
+
+    def translate_vtt_file_multi(self, input_vtt_path: str, output_paths: Dict[str, str],
+                                 batch_size: Optional[int] = None):
+        """
+        Translate a Spanish VTT file to several languages, parsing it only once
+        
+        Args:
+            input_vtt_path (str): Path to input Spanish VTT file
+            output_paths (Dict[str, str]): Target language -> output VTT path
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
+        """
+        segments = self.load_segments(input_vtt_path)
+        
+        for target_lang, output_vtt_path in output_paths.items():
+            translated_segments = self.translate_segments(segments, target_lang, batch_size)
+            
+            # Write translated VTT file
+            self.write_vtt_file(translated_segments, output_vtt_path)
+            print(f"Translation complete! Translated {len(translated_segments)} segments to {target_lang}.")
+
+    def prepare_batch_job(self, jobs: List[Tuple[str, Dict[str, str]]], work_dir: str,
+                          batch_size: Optional[int] = None) -> str:
+        """
+        Write every translation request for a catalog to Batch API JSONL files
+        
+        Each source VTT is parsed once; its segments are stored in the manifest
+        so collect_batch_job can rebuild the outputs without the source files.
+        
+        A manifest already in work_dir that has not been collected yet is
+        reused as is, so rerunning after a crash mid-submit only submits the
+        parts that have no batch_id.
+        
+        Args:
+            jobs (List[Tuple[str, Dict[str, str]]]): (input_vtt_path, {lang: output_vtt_path}) pairs
+            work_dir (str): Folder for the JSONL request files and the manifest
+            batch_size (Optional[int]): Fixed segments per request; None packs by token budget
+            
+        Returns:
+            str: Path to the manifest file
+        """
+        os.makedirs(work_dir, exist_ok=True)
+        manifest_path = os.path.join(work_dir, 'batch_manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if not existing.get('collected'):
+                pending = sum(1 for part in existing['parts'] if not part['batch_id'])
+                print(f"Reusing {manifest_path}: {pending} of {len(existing['parts'])} part(s) still to submit")
+                return manifest_path
+
+        manifest = {'files': [], 'parts': []}
+        requests_written = 0
+        part_file = None
+
+        def open_part():
+            path = os.path.join(work_dir, f"batch_requests_{len(manifest['parts']) + 1:03d}.jsonl")
+            manifest['parts'].append({'input_jsonl': path, 'batch_id': None})
+            return open(path, 'w', encoding='utf-8')
+
+        try:
+            for input_path, output_paths in jobs:
+                try:
+                    segments = self.load_segments(input_path)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"❌ Skipping {input_path}: {e}")
+                    continue
+
+                manifest['files'].append({
+                    'input': input_path,
+                    'outputs': output_paths,
+                    'segments': {
+                        'starts': segments.starts.tolist(),
+                        'ends': segments.ends.tolist(),
+                        'texts': segments.texts
+                    }
+                })
+
+                for target_lang in output_paths:
+                    budget = self._budget(target_lang)
+                    start = 0
+                    for batch in self.make_batches(segments, target_lang, batch_size):
+                        end = start + len(batch)
+                        if part_file is None or requests_written >= self.BATCH_API_MAX_REQUESTS:
+                            if part_file is not None:
+                                part_file.close()
+                            part_file = open_part()
+                            requests_written = 0
+
+                        request = {
+                            'custom_id': f"{len(manifest['files']) - 1}|{target_lang}|{start}|{end}",
+                            'method': 'POST',
+                            'url': '/v1/chat/completions',
+                            'body': {
+                                'model': LANGUAGES[target_lang]['model'],
+                                'messages': self._build_messages(batch.texts, target_lang),
+                                'temperature': 0.3,
+                                'max_tokens': budget['output']
+                            }
+                        }
+                        part_file.write(json.dumps(request, ensure_ascii=False) + '\n')
+                        requests_written += 1
+                        start = end
+        finally:
+            if part_file is not None:
+                part_file.close()
+
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        print(f"Prepared {len(manifest['parts'])} batch file(s) for {len(manifest['files'])} VTT file(s)")
+        return manifest_path
+
+    def submit_batch_job(self, manifest_path: str):
+        """
+        Upload the prepared JSONL files and create one Batch API job per file
+        
+        Args:
+            manifest_path (str): Manifest written by prepare_batch_job
+        """
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        for part in manifest['parts']:
+            if part['batch_id']:
+                continue  # Already submitted on a previous run
+            with open(part['input_jsonl'], 'rb') as f:
+                uploaded = self.client.files.create(file=f, purpose='batch')
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
+            )
+            part['batch_id'] = batch.id
+            print(f"Submitted {part['input_jsonl']} as batch {batch.id}")
+
+            # Record progress after every part so a crash never double-submits
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+    def _read_batch_file(self, file_id: Optional[str]) -> List[dict]:
+        """
+        Download a Batch API output or error file as a list of result objects
+        """
+        if not file_id:
+            return []
+        text = self.client.files.content(file_id).text
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    def collect_batch_job(self, manifest_path: str) -> bool:
+        """
+        Download finished Batch API results and write the translated VTT files
+        
+        Completed, expired and cancelled batches all contribute whatever output
+        they have. Requests without a successful response (failed batch, expired
+        before reaching them, or errored individually) are moved into a smaller
+        JSONL and the part's batch_id is cleared, so the next --batch-submit
+        resends only those. Answers already received are kept next to the part
+        file. After BATCH_MAX_SUBMITS attempts the remaining segments are
+        written in Spanish.
         
-        # Write translated VTT file
-        self.write_vtt_file(translated_segments, output_vtt_path)
-        print(f"Translation complete! Translated {len(translated_segments)} segments.")
+        Args:
+            manifest_path (str): Manifest written by prepare_batch_job
+            
+        Returns:
+            bool: True if every batch had finished and the outputs were written
+        """
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        batches = []
+        for part in manifest['parts']:
+            if not part['batch_id']:
+                print(f"⏳ {part['input_jsonl']} has not been submitted yet")
+                return False
+            batch = self.client.batches.retrieve(part['batch_id'])
+            if batch.status not in self.BATCH_TERMINAL_STATUSES:
+                print(f"⏳ Batch {batch.id} is {batch.status}")
+                return False
+            batches.append(batch)
+
+        # custom_id -> translated content
+        answers = {}
+        resend = 0
+        for part, batch in zip(manifest['parts'], batches):
+            results_path = part['input_jsonl'][:-len('.jsonl')] + '_results.json'
+            received = {}
+            if os.path.exists(results_path):
+                with open(results_path, 'r', encoding='utf-8') as f:
+                    received = json.load(f)
+
+            errors = []
+            for result in self._read_batch_file(batch.output_file_id) + self._read_batch_file(batch.error_file_id):
+                response = result.get('response') or {}
+                if response.get('status_code') == 200:
+                    received[result['custom_id']] = response['body']['choices'][0]['message']['content']
+                else:
+                    errors.append(result.get('error') or response.get('body'))
+            if batch.status == 'failed' and batch.errors:
+                errors.extend(error.message for error in batch.errors.data or [])
+            if batch.status != 'completed' or errors:
+                print(f"⚠️  Batch {batch.id} {batch.status}: {len(errors)} error(s)"
+                      + (f", first: {errors[0]}" if errors else ""))
+
+            with open(part['input_jsonl'], 'r', encoding='utf-8') as f:
+                requests_left = [line for line in f
+                                 if line.strip() and json.loads(line)['custom_id'] not in received]
+            attempts = part.get('attempts', 1)
+            if requests_left and attempts < self.BATCH_MAX_SUBMITS:
+                with open(results_path, 'w', encoding='utf-8') as f:
+                    json.dump(received, f, ensure_ascii=False)
+                with open(part['input_jsonl'], 'w', encoding='utf-8') as f:
+                    f.writelines(requests_left)
+                part['batch_id'] = None
+                part['attempts'] = attempts + 1
+                resend += len(requests_left)
+            answers.update(received)
+
+        if resend:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            print(f"🔁 {resend} request(s) got no answer; run --batch-submit again to resend them")
+            return False
 
-def main():
+        # (file_index, lang) -> [(start, end, content)]
+        responses = {}
+        for custom_id, message in answers.items():
+            file_index, target_lang, start, end = custom_id.split('|')
+            responses.setdefault((int(file_index), target_lang), []).append(
+                (int(start), int(end), message)
+            )
+
+        for file_index, entry in enumerate(manifest['files']):
+            segments = CueTable(**entry['segments'])
+            for target_lang, output_path in entry['outputs'].items():
+                # Failed requests keep the original Spanish text, like translate_batch
+                translated_texts = list(segments.texts)
+                translated_count = 0
+                for start, end, message in responses.get((file_index, target_lang), []):
+                    translated_texts[start:end] = self._match_translations(
+                        message, segments.texts[start:end]
+                    )
+                    translated_count += end - start
+                missing = len(segments) - translated_count
+                if missing:
+                    print(f"Warning: {missing} segments of {entry['input']} [{target_lang}] kept in Spanish (failed requests)")
+
+                self.write_vtt_file(segments.with_texts(translated_texts), output_path)
+
+        # The next --batch-submit prepares a fresh manifest
+        manifest['collected'] = True
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        return True
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Exponential backoff with full jitter, honoring Retry-After when sent
+        """
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt)))
+
+    async def translate_batch_async(self, spanish_texts: List[str], batch_number: int = 1,
+                                    target_lang: str = 'en') -> List[str]:
+        """
+        Translate a batch of Spanish texts without blocking other batches
+        
+        Args:
+            spanish_texts (List[str]): List of Spanish texts to translate
+            batch_number (int): Batch number for progress tracking
+            target_lang (str): Key of LANGUAGES to translate into
+            
+        Returns:
+            List[str]: List of translated texts
+        """
+        messages = self._build_messages(spanish_texts, target_lang)
+        max_tokens = self._budget(target_lang)['output']
+        # Rough estimate of prompt plus completion budget
+        estimated_tokens = sum(
+            TokenBudgetBatcher.estimate_tokens(m['content']) for m in messages
+        ) + max_tokens
+
+        for attempt in range(self.MAX_RETRIES):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                raw = await self.async_client.chat.completions.with_raw_response.create(
+                    model=LANGUAGES[target_lang]['model'],
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=max_tokens
+                )
+                self.rate_limiter.update_from_headers(raw.headers)
+                response = raw.parse()
+                return self._match_translations(response.choices[0].message.content, spanish_texts)
+
+            except RateLimitError as e:
+                self.rate_limiter.update_from_headers(e.response.headers)
+                self.rate_limiter.drain()
+                delay = self._backoff_delay(attempt, e.response.headers.get('retry-after'))
+                print(f"Rate limited on batch {batch_number} [{target_lang}], retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            except APIStatusError as e:
+                if e.status_code < 500:
+                    print(f"Error translating batch {batch_number} [{target_lang}]: {e}")
+                    break
+                delay = self._backoff_delay(attempt)
+                print(f"Server error on batch {batch_number} [{target_lang}], retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            except APIConnectionError as e:
+                # Also covers APITimeoutError
+                delay = self._backoff_delay(attempt)
+                print(f"Connection error on batch {batch_number} [{target_lang}] ({e}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                print(f"Error translating batch {batch_number} [{target_lang}]: {e}")
+                break
+
+        print(f"Batch {batch_number} [{target_lang}] failed, falling back to original Spanish text...")
+        return spanish_texts
+
+    async def translate_segments_async(self, segments: CueTable, target_lang: str = 'en',
+                                       batch_size: Optional[int] = None, max_concurrency: int = 4) -> CueTable:
+        """
+        Translate already-parsed segments to one language, sending batches concurrently
+        
+        Args:
+            segments (CueTable): Segments from load_segments
+            target_lang (str): Key of LANGUAGES to translate into
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
+            max_concurrency (int): Maximum number of in-flight batches
+            
+        Returns:
+            CueTable: Translated segments with the source timings
+        """
+        batches = self.make_batches(segments, target_lang, batch_size)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_batch(batch: CueTable, batch_number: int) -> List[str]:
+            async with semaphore:
+                texts = await self.translate_batch_async(batch.texts, batch_number, target_lang)
+                print(f"Completed batch {batch_number}/{len(batches)} [{target_lang}]")
+                return texts
+
+        results = await asyncio.gather(
+            *(run_batch(batch, n + 1) for n, batch in enumerate(batches))
+        )
+
+        return segments.with_texts(text for translated_texts in results for text in translated_texts)
+
+    async def translate_vtt_file_async(self, input_vtt_path: str, output_paths: Dict[str, str],
+                                       batch_size: Optional[int] = None, max_concurrency: int = 4):
+        """
+        Translate a Spanish VTT file to every requested language concurrently,
+        parsing it only once
+        
+        Args:
+            input_vtt_path (str): Path to input Spanish VTT file
+            output_paths (Dict[str, str]): Target language -> output VTT path
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
+            max_concurrency (int): Maximum number of in-flight batches per language
+        """
+        segments = self.load_segments(input_vtt_path)
+
+        async def run_language(target_lang: str, output_vtt_path: str):
+            translated_segments = await self.translate_segments_async(
+                segments, target_lang, batch_size, max_concurrency
+            )
+            self.write_vtt_file(translated_segments, output_vtt_path)
+            print(f"Translation complete! Translated {len(translated_segments)} segments to {target_lang}.")
+
+        await asyncio.gather(*(run_language(lang, path) for lang, path in output_paths.items()))
+
+    async def translate_files_async(self, jobs: List[Tuple[str, Dict[str, str]]], batch_size: Optional[int] = None,
+                                    max_files: int = 3, max_concurrency: int = 4):
+        """
+        Translate several VTT files at once; all share the same rate limiter
+        
+        Args:
+            jobs (List[Tuple[str, Dict[str, str]]]): (input_vtt_path, {lang: output_vtt_path}) pairs
+            batch_size (Optional[int]): Fixed segments per API call; None packs by token budget
+            max_files (int): Maximum number of files translated at the same time
+            max_concurrency (int): Maximum number of in-flight batches per file and language
+        """
+        semaphore = asyncio.Semaphore(max_files)
+
+        async def run_file(input_path: str, output_paths: Dict[str, str]):
+            async with semaphore:
+                try:
+                    await self.translate_vtt_file_async(input_path, output_paths, batch_size, max_concurrency)
+                    print(f"\n✅ Translation completed: {input_path}")
+                except FileNotFoundError as e:
+                    print(f"❌ Error: {e}")
+                except Exception as e:
+                    print(f"❌ Unexpected error on {input_path}: {e}")
+
+        await asyncio.gather(*(run_file(i, o) for i, o in jobs))
+
+def main(languages: List[str] = None, database_file: str = 'file_data.db', path_filter: str = '%DEFCON%'):
     """
     Example usage of the VTT translator
+
+    Every source VTT is parsed once and written out as <name>-<lang>.vtt for
+    each target language. Pick languages with --lang en,pt (default: all).
     """
+    if languages is None:
+        languages = list(LANGUAGES)
+        if '--lang' in sys.argv:
+            idx = sys.argv.index('--lang')
+            if idx + 1 < len(sys.argv):
+                languages = [lang.strip() for lang in sys.argv[idx + 1].split(',') if lang.strip()]
+
+    unknown = [lang for lang in languages if lang not in LANGUAGES]
+    if unknown:
+        print(f"❌ Unsupported target language(s): {', '.join(unknown)} (available: {', '.join(LANGUAGES)})")
+        return
+
     # Option 1: Set API key directly
     translator = VTTTranslator(api_key="")
     
@@ -256,44 +814,70 @@ def main():
     #     return
     
     
-    database_file = 'file_data.db'
     # Establish a connection to the SQLite database
     connection = sqlite3.connect(database_file)
     cursor = connection.cursor()
     
-    cursor.execute("SELECT * FROM files WHERE full_path LIKE '%DEFCON%'")
+    cursor.execute("SELECT * FROM files WHERE full_path LIKE ?", (path_filter,))
     matching_files = cursor.fetchall()
     row_count = len(matching_files) + 0
     # Close the database connection
     connection.close()
 
+    # Async mode: python 06_Translation.py --async
+    # Batches, languages and files run concurrently, paced by the account's rate limits
+    async_mode = '--async' in sys.argv
+
+    # Offline mode for back-catalog runs (OpenAI Batch API, results within 24h):
+    #   python 06_Translation.py --batch-submit   prepare + submit every request
+    #   python 06_Translation.py --batch-collect  write the VTTs once batches finish
+    # One folder per database and language set, so 06 and 07 never share a manifest
+    database_name = os.path.splitext(os.path.basename(database_file))[0]
+    batch_dir = os.path.join('translation_batches', f"{database_name}_{'-'.join(languages)}")
+    if '--batch-collect' in sys.argv:
+        manifest_path = os.path.join(batch_dir, 'batch_manifest.json')
+        if translator.collect_batch_job(manifest_path):
+            print("\n✅ Batch translation collected successfully!")
+        return
+    batch_mode = '--batch-submit' in sys.argv
+    jobs = []
+
     for row in matching_files:
         id, full_path, filename, extension, for_processing = row
-        input_file = full_path
         current_folder = os.path.dirname(full_path)
         file_name_without_extension = os.path.splitext(os.path.basename(filename))[0]
         original_spanish_output_vtt_file = os.path.join(current_folder, file_name_without_extension + '.vtt')
-        translated_english_output_vtt_file = os.path.join(current_folder, file_name_without_extension + '-en' + '.vtt')
         
         # Translate VTT file
         input_file = original_spanish_output_vtt_file # Change to your input file
-        output_file = translated_english_output_vtt_file  # Change to your desired output file
+        output_files = {lang: output_path_for(input_file, lang) for lang in languages}
+
+        if async_mode or batch_mode:
+            jobs.append((input_file, output_files))
+            continue
         
         try:
-            translator.translate_vtt_file(
+            translator.translate_vtt_file_multi(
                 input_vtt_path=input_file,
-                output_vtt_path=output_file,
-                batch_size=8  # Adjust based on your needs and rate limits
+                output_paths=output_files
             )
             
             print("\n✅ Translation completed successfully!")
             print(f"📁 Input file: {input_file}")
-            print(f"📁 Output file: {output_file}")
+            for output_file in output_files.values():
+                print(f"📁 Output file: {output_file}")
             
         except FileNotFoundError as e:
             print(f"❌ Error: {e}")
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
 
+    if batch_mode and jobs:
+        manifest_path = translator.prepare_batch_job(jobs, batch_dir)
+        translator.submit_batch_job(manifest_path)
+        print("\n📦 Batches submitted, run again with --batch-collect once they complete")
+    elif async_mode and jobs:
+        asyncio.run(translator.translate_files_async(jobs))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
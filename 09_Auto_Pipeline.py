@@ -6,26 +6,43 @@ Processes videos and documents:
 - Videos: Download → Audio extraction → WhisperX transcription → Translation → Summary
 - Documents (PDF, DOCX, etc.): Download → MarkItDown extraction → Summary + Keywords
 
-Submits results to backend API with resume capability.
+Submits results to backend API in the background with resume capability.
 """
 
 import json
+import bisect
+import gzip
+import hashlib
+import math
 import os
+import re
 import sys
 import time
 import logging
 import subprocess
+import threading
+import multiprocessing
+from collections import Counter, deque
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from typing import List, Dict, Tuple, Optional, Iterator
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import ffmpeg
-import whisperx
 import gc
 from markitdown import MarkItDown
 
+from vtt_io import read_vtt, write_vtt, format_timestamp, seconds_to_ms
+from token_budget import TokenBudgetBatcher
+from document_reader import read_document, extraction_worker
+from search_index import open_index, cue_windows, text_chunks, FullTextIndex
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -35,12 +52,25 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class VttCue:
-    """Represents a single VTT cue."""
-    start_time: str
-    end_time: str
+    """Represents a single VTT cue.
+
+    Timestamps are integer milliseconds; they are only formatted as
+    HH:MM:SS.mmm when written to a file or uploaded.
+    """
+    __slots__ = ('start_ms', 'end_ms', 'text', 'sequence_order')
+    start_ms: int
+    end_ms: int
     text: str
     sequence_order: int
 
+    @property
+    def start_time(self) -> str:
+        return format_timestamp(self.start_ms)
+
+    @property
+    def end_time(self) -> str:
+        return format_timestamp(self.end_ms)
+
 
 class ConfigManager:
     """Load and validate JSON config."""
@@ -75,7 +105,9 @@ class ConfigManager:
             'model': 'qwen2.5:7b',
             'host': 'http://localhost:11434',
             'target_languages': ['es', 'pt'],
-            'batch_size': 5,
+            'context_tokens': 4096,
+            'max_output_tokens': 1024,
+            'max_batch_cues': 40,
             'timeout': 120
         })
 
@@ -96,44 +128,223 @@ class ConfigManager:
         })
 
 
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class ProgressTracker:
-    """Track processed IDs with save/load capability."""
+    """Track processed IDs with save/load capability.
+
+    State is a JSON snapshot (`progress_file`) plus an append-only JSONL
+    journal next to it (`<progress_file>.journal`). Each mark appends and
+    fsyncs one line; the journal is folded back into the snapshot every
+    `compact_every` entries and when the run ends. A crash can at worst
+    tear the last journal line, never the snapshot.
+
+    Items that are not finished yet also record which stages they completed
+    (downloaded, audio, vtt, submitted, translated:<lang>, summarized) along
+    with artifact paths and hashes, so a rerun resumes at the first missing
+    stage instead of starting over. Upload stages are recorded once
+    UploadQueue reports them acknowledged.
+    """
 
-    def __init__(self, progress_file: str):
+    def __init__(self, progress_file: str, compact_every: int = 1000):
         self.progress_file = progress_file
-        self.data = self._load()
-
-    def _load(self) -> dict:
+        self.journal_file = progress_file + '.journal'
+        self.compact_every = compact_every
+        self.processed = set()
+        self.failed = {}
+        self.stages = {}
+        self.last_run = None
+        self.pending_entries = 0
+        self._load()
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+
+    def _load(self):
         if os.path.exists(self.progress_file):
             with open(self.progress_file, 'r') as f:
-                return json.load(f)
-        return {
-            'processed_ids': [],
-            'failed_ids': {},
-            'last_run': None
-        }
+                data = json.load(f)
+            self.processed = set(data.get('processed_ids', []))
+            self.failed = dict(data.get('failed_ids', {}))
+            self.stages = dict(data.get('stages', {}))
+            self.last_run = data.get('last_run')
+
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                content = f.read()
+                complete = content.rfind(b'\n') + 1
+                if complete < len(content):
+                    # Torn last line from a crash mid-write, drop it so new
+                    # entries start on a fresh line
+                    f.truncate(complete)
+            for line in content[:complete].decode('utf-8', errors='replace').splitlines():
+                try:
+                    self._apply(json.loads(line))
+                    self.pending_entries += 1
+                except (ValueError, KeyError, TypeError):
+                    continue
 
-    def _save(self):
-        self.data['last_run'] = datetime.utcnow().isoformat() + 'Z'
-        with open(self.progress_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+    def _apply(self, entry: dict):
+        item_id = entry['id']
+        if entry['op'] == 'processed':
+            self.processed.add(item_id)
+            self.failed.pop(str(item_id), None)
+            # Finished items are skipped outright, their stages are no longer needed
+            self.stages.pop(str(item_id), None)
+        elif entry['op'] == 'failed':
+            self.failed[str(item_id)] = entry['reason']
+        elif entry['op'] == 'stage':
+            self.stages.setdefault(str(item_id), {})[entry['stage']] = entry['info']
+
+    def _append(self, entry: dict):
+        self._apply(entry)
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.pending_entries += 1
+        if self.pending_entries >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write a fresh snapshot atomically, then empty the journal."""
+        self.last_run = datetime.utcnow().isoformat() + 'Z'
+        data = {
+            'processed_ids': sorted(self.processed),
+            'failed_ids': self.failed,
+            'stages': self.stages,
+            'last_run': self.last_run
+        }
+        tmp_path = self.progress_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.progress_file)
+        # Replaying entries already in the snapshot is harmless, so a crash
+        # before the truncate below loses nothing
+        self._journal.truncate(0)
+        self._journal.seek(0)
+        self.pending_entries = 0
+
+    def close(self):
+        if self.pending_entries:
+            self.compact()
+        self._journal.close()
 
     def is_processed(self, item_id: int) -> bool:
-        return item_id in self.data['processed_ids']
+        return item_id in self.processed
 
     def mark_processed(self, item_id: int):
-        if item_id not in self.data['processed_ids']:
-            self.data['processed_ids'].append(item_id)
-        if str(item_id) in self.data['failed_ids']:
-            del self.data['failed_ids'][str(item_id)]
-        self._save()
+        if item_id in self.processed and str(item_id) not in self.failed:
+            return
+        self._append({'op': 'processed', 'id': item_id})
 
     def mark_failed(self, item_id: int, reason: str):
-        self.data['failed_ids'][str(item_id)] = reason
-        self._save()
+        self._append({'op': 'failed', 'id': item_id, 'reason': reason})
 
     def get_stats(self) -> Tuple[int, int]:
-        return len(self.data['processed_ids']), len(self.data['failed_ids'])
+        return len(self.processed), len(self.failed)
+
+    def stage_done(self, item_id: int, stage: str) -> bool:
+        return stage in self.stages.get(str(item_id), {})
+
+    def mark_stage(self, item_id: int, stage: str, path: Optional[str] = None):
+        """Record a completed stage, with its artifact's path, size and hash if any."""
+        info = {}
+        if path:
+            info = {'path': path, 'size': os.path.getsize(path), 'sha256': file_sha256(path)}
+        self._append({'op': 'stage', 'id': item_id, 'stage': stage, 'info': info})
+
+    def stage_artifact(self, item_id: int, stage: str) -> Optional[str]:
+        """Path recorded for a completed stage, if the file is still there and intact.
+
+        Checks the size rather than re-hashing, which would cost as much as
+        the download for large videos.
+        """
+        info = self.stages.get(str(item_id), {}).get(stage)
+        if not info or not info.get('path'):
+            return None
+        path = info['path']
+        if not os.path.exists(path) or os.path.getsize(path) != info.get('size'):
+            logger.info(f"Recorded {stage} artifact for {item_id} is missing or changed: {path}")
+            return None
+        return path
+
+
+class TranslationJournal:
+    """Append-only per-batch checkpoint of translated cues.
+
+    One JSONL file per (item_id, language), each line
+    {"seq": int, "src": hash of the source cue text, "text": str}.
+    Lets translate_all resume a crashed run without re-translating finished
+    cues; entries whose source cue changed (re-transcribed VTT) are dropped.
+    """
+
+    def __init__(self, journal_dir: str):
+        self.journal_dir = journal_dir
+        os.makedirs(self.journal_dir, exist_ok=True)
+
+    def _path(self, item_id: int, target_lang: str) -> str:
+        return os.path.join(self.journal_dir, f"{item_id}_{target_lang}.jsonl")
+
+    @staticmethod
+    def source_hash(text: str) -> str:
+        """Short stable hash of a source cue's text."""
+        return hashlib.blake2b(text.strip().encode('utf-8'), digest_size=8).hexdigest()
+
+    def load(self, item_id: int, target_lang: str, sources: Dict[int, str]) -> Dict[int, str]:
+        """Return {sequence_order: translated_text} recorded for the current source cues.
+
+        Args:
+            sources: {sequence_order: source_text} of the cues being translated
+        """
+        path = self._path(item_id, target_lang)
+        translations = {}
+        if not os.path.exists(path):
+            return translations
+
+        stale = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    seq = int(entry['seq'])
+                    if seq in sources and entry.get('src') == self.source_hash(sources[seq]):
+                        translations[seq] = entry['text']
+                    else:
+                        stale += 1
+                except (ValueError, KeyError, TypeError):
+                    # Torn last line from a crash mid-write, ignore it
+                    continue
+        if stale:
+            logger.info(f"Dropped {stale} journaled {target_lang} translations for ID {item_id}: source cues changed")
+        return translations
+
+    def append(self, item_id: int, target_lang: str, translations: Dict[int, str], sources: Dict[int, str]):
+        """Durably record a finished batch of translations with their source hashes."""
+        if not translations:
+            return
+        path = self._path(item_id, target_lang)
+        with open(path, 'a', encoding='utf-8') as f:
+            for seq, text in translations.items():
+                entry = {'seq': seq, 'src': self.source_hash(sources[seq]), 'text': text}
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self, item_id: int, target_lang: str):
+        """Drop the checkpoint once the translation is safely stored."""
+        path = self._path(item_id, target_lang)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove translation journal {path}: {e}")
 
 
 class VideoDownloader:
@@ -218,19 +429,223 @@ class AudioExtractor:
             raise RuntimeError(f"FFmpeg extraction failed: {e}")
 
 
+class CueSegmenter:
+    """Split over-long WhisperX segments into readable cues using word timings.
+
+    Segments longer than `max_chars` or `max_duration_ms` are cut between
+    words, preferably after punctuation. Cues read faster than `max_cps` are
+    then held on screen longer, into the silence before the next cue.
+    """
+
+    BREAK_AFTER = ('.', '?', '!', ',', ';', ':')
+
+    def __init__(self, max_chars: int = 84, max_cps: float = 20.0, max_duration_ms: int = 7000):
+        self.max_chars = max_chars
+        self.max_cps = max_cps
+        self.max_duration_ms = max_duration_ms
+
+    def settings(self) -> dict:
+        return {'max_chars': self.max_chars, 'max_cps': self.max_cps, 'max_duration_ms': self.max_duration_ms}
+
+    def segment(self, segments: List[dict]) -> List[Tuple[int, int, str]]:
+        """Return (start_ms, end_ms, text) cues for aligned WhisperX segments."""
+        cues = []
+        for segment in segments:
+            text = segment["text"].strip()
+            start = seconds_to_ms(segment["start"])
+            end = seconds_to_ms(segment["end"])
+            words = self._timed_words(segment, start)
+            if not words or (len(text) <= self.max_chars and end - start <= self.max_duration_ms):
+                cues.append([start, end, text])
+            else:
+                cues.extend(self._split(words))
+        self._ease_reading_speed(cues)
+        return [tuple(cue) for cue in cues]
+
+    def _timed_words(self, segment: dict, segment_start: int) -> List[Tuple[str, int, int]]:
+        """Words with millisecond timings; unaligned words (e.g. numbers) inherit the previous end."""
+        words = []
+        last_end = segment_start
+        for word in segment.get("words") or []:
+            text = word.get("word", "").strip()
+            if not text:
+                continue
+            start = seconds_to_ms(word["start"]) if "start" in word else last_end
+            end = max(seconds_to_ms(word["end"]) if "end" in word else start, start)
+            words.append((text, start, end))
+            last_end = end
+        return words
+
+    def _split(self, words: List[Tuple[str, int, int]]) -> List[List]:
+        cues = []
+        current = []
+        length = 0
+
+        def flush():
+            cues.append([current[0][1], current[-1][2], " ".join(w[0] for w in current)])
+            current.clear()
+
+        for word in words:
+            text, start, end = word
+            if current and (length + 1 + len(text) > self.max_chars
+                            or end - current[0][1] > self.max_duration_ms):
+                flush()
+                length = 0
+            current.append(word)
+            length += len(text) + (1 if length else 0)
+            # Prefer clause boundaries once the cue is reasonably full
+            if length >= self.max_chars // 2 and text.endswith(self.BREAK_AFTER):
+                flush()
+                length = 0
+        if current:
+            flush()
+        return cues
+
+    def _ease_reading_speed(self, cues: List[List]):
+        for i, cue in enumerate(cues):
+            start, end, text = cue
+            needed = int(len(text) * 1000 / self.max_cps)
+            if end - start >= needed:
+                continue
+            limit = cues[i + 1][0] if i + 1 < len(cues) else start + needed
+            cue[1] = max(end, min(start + needed, limit))
+
+
+class AlignmentStore:
+    """Word-level WhisperX alignment per item, kept as compressed NumPy arrays.
+
+    `<alignment_dir>/<item_id>.npz` holds word start/end milliseconds (-1 where
+    WhisperX could not align a word), scores, word and segment texts as UTF-8
+    blobs, and segment bounds. Re-segmentation, karaoke-style exports and
+    precise seeking can then work without re-running alignment.
+    """
+
+    def __init__(self, alignment_dir: str):
+        self.alignment_dir = alignment_dir
+        os.makedirs(self.alignment_dir, exist_ok=True)
+
+    def path(self, item_id: int) -> str:
+        return os.path.join(self.alignment_dir, f"{item_id}.npz")
+
+    @staticmethod
+    def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    @staticmethod
+    def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+        data = blob.tobytes()
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    def save(self, item_id: int, segments: List[dict], meta: dict):
+        """Store aligned segments; `meta` identifies the audio and model they came from."""
+        word_texts, word_starts, word_ends, scores, first_word = [], [], [], [], []
+        for segment in segments:
+            first_word.append(len(word_texts))
+            for word in segment.get("words") or []:
+                word_texts.append(word.get("word", ""))
+                word_starts.append(seconds_to_ms(word["start"]) if "start" in word else -1)
+                word_ends.append(seconds_to_ms(word["end"]) if "end" in word else -1)
+                scores.append(word.get("score", np.nan))
+        first_word.append(len(word_texts))
+
+        word_blob, word_offsets = self._pack_strings(word_texts)
+        segment_blob, segment_offsets = self._pack_strings([segment["text"] for segment in segments])
+        meta_blob, _ = self._pack_strings([json.dumps(meta, sort_keys=True)])
+
+        tmp_path = self.path(item_id) + '.tmp.npz'
+        try:
+            np.savez_compressed(
+                tmp_path,
+                meta=meta_blob,
+                word_start_ms=np.array(word_starts, dtype=np.int32),
+                word_end_ms=np.array(word_ends, dtype=np.int32),
+                word_score=np.array(scores, dtype=np.float16),
+                word_text=word_blob,
+                word_offsets=word_offsets,
+                segment_start_ms=np.array([seconds_to_ms(s["start"]) for s in segments], dtype=np.int32),
+                segment_end_ms=np.array([seconds_to_ms(s["end"]) for s in segments], dtype=np.int32),
+                segment_first_word=np.array(first_word, dtype=np.int64),
+                segment_text=segment_blob,
+                segment_offsets=segment_offsets
+            )
+            os.replace(tmp_path, self.path(item_id))
+            logger.info(f"Word alignment saved: {self.path(item_id)} ({len(word_texts)} words)")
+        except OSError as e:
+            logger.warning(f"Failed to save word alignment: {e}")
+
+    def load(self, item_id: int, meta: Optional[dict] = None) -> Optional[List[dict]]:
+        """Aligned segments in WhisperX's shape, or None if missing or made from other input."""
+        path = self.path(item_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable word alignment {path}: {e}")
+            return None
+
+        stored_meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+        if meta is not None and stored_meta != json.loads(json.dumps(meta, sort_keys=True)):
+            return None
+
+        words = self._unpack_strings(arrays['word_text'], arrays['word_offsets'])
+        texts = self._unpack_strings(arrays['segment_text'], arrays['segment_offsets'])
+        starts = arrays['word_start_ms'].tolist()
+        ends = arrays['word_end_ms'].tolist()
+        scores = arrays['word_score'].astype(np.float32).tolist()
+        first_word = arrays['segment_first_word'].tolist()
+        segment_starts = arrays['segment_start_ms'].tolist()
+        segment_ends = arrays['segment_end_ms'].tolist()
+
+        segments = []
+        for i, text in enumerate(texts):
+            segment_words = []
+            for w in range(first_word[i], first_word[i + 1]):
+                word = {"word": words[w]}
+                if starts[w] >= 0:
+                    word["start"] = starts[w] / 1000
+                if ends[w] >= 0:
+                    word["end"] = ends[w] / 1000
+                if not math.isnan(scores[w]):
+                    word["score"] = scores[w]
+                segment_words.append(word)
+            segments.append({
+                "start": segment_starts[i] / 1000,
+                "end": segment_ends[i] / 1000,
+                "text": text,
+                "words": segment_words
+            })
+        return segments
+
+
 class WhisperXProcessor:
     """Generate VTT cues from audio using WhisperX."""
 
-    def __init__(self, config: dict, vtt_dir: str):
+    def __init__(self, config: dict, vtt_dir: str, alignment_dir: Optional[str] = None):
         self.model_name = config.get('model', 'medium')
         self.device = config.get('device', 'cuda')
         self.compute_type = config.get('compute_type', 'float16')
         self.batch_size = config.get('batch_size', 16)
         self.vtt_dir = vtt_dir
+        self.alignments = AlignmentStore(alignment_dir) if alignment_dir else None
         self.model = None
+        self.segmenter = None
+        if config.get('resegment', True):
+            self.segmenter = CueSegmenter(
+                max_chars=config.get('max_cue_chars', 84),
+                max_cps=config.get('max_cue_cps', 20.0),
+                max_duration_ms=config.get('max_cue_duration_ms', 7000)
+            )
 
     def _load_model(self):
         if self.model is None:
+            # Imported here, not at the top: document workers are spawned and
+            # re-import this script, and must not load torch
+            import whisperx
             logger.info(f"Loading WhisperX model: {self.model_name}")
             self.model = whisperx.load_model(
                 self.model_name,
@@ -239,7 +654,50 @@ class WhisperXProcessor:
             )
 
     def process(self, audio_path: str, item_id: int) -> List[VttCue]:
-        """Generate VTT cues from audio file."""
+        """Generate VTT cues from audio file.
+
+        Reuses the saved VTT when it was made from the same audio with the
+        same model settings, so retries after a backend outage skip the GPU.
+        """
+        audio_hash = file_sha256(audio_path)
+        cues = self._load_cached_vtt(item_id, audio_hash)
+        if cues is not None:
+            return cues
+
+        # Cue settings changed since the last run: re-segment the stored
+        # word alignment instead of transcribing again
+        alignment_meta = {'audio_sha256': audio_hash, **self._transcription_settings()}
+        segments = self.alignments.load(item_id, alignment_meta) if self.alignments else None
+        if segments is not None:
+            logger.info(f"Re-segmenting {item_id} from stored word alignment")
+        else:
+            segments = self._transcribe(audio_path)
+            if self.alignments:
+                self.alignments.save(item_id, segments, alignment_meta)
+
+        # Convert to VttCue objects, splitting long segments on word timings
+        if self.segmenter:
+            timings = self.segmenter.segment(segments)
+            logger.info(f"Re-segmented {len(segments)} segments into {len(timings)} cues")
+        else:
+            timings = [
+                (seconds_to_ms(segment["start"]), seconds_to_ms(segment["end"]), segment["text"].strip())
+                for segment in segments
+            ]
+        cues = [
+            VttCue(start_ms=start_ms, end_ms=end_ms, text=text, sequence_order=i + 1)
+            for i, (start_ms, end_ms, text) in enumerate(timings)
+        ]
+
+        # Save local VTT file for reference
+        self._save_vtt(cues, item_id)
+        self._save_vtt_meta(item_id, audio_hash, len(cues))
+
+        return cues
+
+    def _transcribe(self, audio_path: str) -> List[dict]:
+        """Transcribe and word-align audio, return WhisperX segments."""
+        import whisperx
         self._load_model()
 
         logger.info(f"Transcribing: {audio_path}")
@@ -269,56 +727,173 @@ class WhisperXProcessor:
         elapsed = time.time() - start_time
         logger.info(f"Transcription completed in {elapsed:.2f}s")
 
-        # Convert to VttCue objects
-        cues = []
-        for i, segment in enumerate(result["segments"]):
-            cue = VttCue(
-                start_time=self._format_time(segment["start"]),
-                end_time=self._format_time(segment["end"]),
-                text=segment["text"].strip(),
-                sequence_order=i + 1
-            )
-            cues.append(cue)
+        return result["segments"]
 
-        # Save local VTT file for reference
-        self._save_vtt(cues, item_id)
+    def _transcription_settings(self) -> dict:
+        return {'model': self.model_name, 'compute_type': self.compute_type}
+
+    def _model_settings(self) -> dict:
+        return {
+            **self._transcription_settings(),
+            'segmenter': self.segmenter.settings() if self.segmenter else None
+        }
 
+    def _load_cached_vtt(self, item_id: int, audio_hash: str) -> Optional[List[VttCue]]:
+        """Cues from a previous transcription of this audio, or None."""
+        vtt_path = self.vtt_path(item_id)
+        meta_path = vtt_path + '.json'
+        if not os.path.exists(vtt_path) or not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('audio_sha256') != audio_hash or meta.get('settings') != self._model_settings():
+            logger.info(f"Saved VTT for {item_id} is stale, transcribing again")
+            return None
+
+        cues = self.load_vtt(vtt_path)
+        if len(cues) != meta.get('cue_count'):
+            logger.warning(f"Saved VTT for {item_id} is incomplete, transcribing again")
+            return None
+        logger.info(f"Reusing saved VTT for {item_id}: {vtt_path} ({len(cues)} cues)")
         return cues
 
-    def _format_time(self, seconds: float) -> str:
-        """Convert seconds to VTT time format (HH:MM:SS.mmm)."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+    def _save_vtt_meta(self, item_id: int, audio_hash: str, cue_count: int):
+        """Sidecar recording what the saved VTT was generated from."""
+        meta_path = self.vtt_path(item_id) + '.json'
+        meta = {
+            'audio_sha256': audio_hash,
+            'settings': self._model_settings(),
+            'cue_count': cue_count
+        }
+        tmp_path = meta_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            logger.warning(f"Failed to save VTT metadata: {e}")
+
+    def vtt_path(self, item_id: int) -> str:
+        return os.path.join(self.vtt_dir, f"{item_id}.vtt")
+
+    def load_vtt(self, path: str) -> List[VttCue]:
+        """Rebuild cues from a VTT file written by _save_vtt."""
+        return [
+            VttCue(start_ms, end_ms, text, i)
+            for i, (start_ms, end_ms, text) in enumerate(read_vtt(path), 1)
+        ]
 
     def _save_vtt(self, cues: List[VttCue], item_id: int):
         """Save VTT file locally for reference."""
-        output_path = os.path.join(self.vtt_dir, f"{item_id}.vtt")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("WEBVTT\n\n")
-            for cue in cues:
-                f.write(f"{cue.start_time} --> {cue.end_time}\n")
-                f.write(f"{cue.text}\n\n")
+        output_path = self.vtt_path(item_id)
+        write_vtt(output_path, (
+            (cue.start_ms, cue.end_ms, cue.text) for cue in cues
+        ))
         logger.info(f"VTT saved: {output_path}")
 
 
+# Longest wait for the next streamed chunk (including the first token, after
+# prompt evaluation) before a generation is treated as stalled
+OLLAMA_STREAM_IDLE_TIMEOUT = 60
+
+
+def ollama_generate(
+    host: str,
+    payload: dict,
+    timeout: int,
+    stream: bool = True,
+    is_complete=None,
+    max_chars: Optional[int] = None
+) -> Optional[str]:
+    """Call Ollama /api/generate and return the generated text.
+
+    With stream=True the NDJSON chunks are consumed as they arrive. Generation
+    stops early once is_complete(text) says the expected output is there.
+    Runaway output (longer than max_chars, the same line repeated), running
+    past `timeout` seconds in total, or no chunk for OLLAMA_STREAM_IDLE_TIMEOUT
+    seconds cancels it and returns None, like an HTTP error. Closing the
+    connection makes Ollama abort the generation, so a stuck request stops
+    holding a model slot.
+    """
+    url = f"{host}/api/generate"
+
+    if not stream:
+        response = requests.post(url, json=dict(payload, stream=False), timeout=timeout)
+        if response.status_code != 200:
+            return None
+        return response.json().get('response', '')
+
+    # The read timeout bounds the gap between chunks; the total is checked
+    # against the deadline as chunks arrive
+    deadline = time.monotonic() + timeout
+    idle_timeout = min(timeout, OLLAMA_STREAM_IDLE_TIMEOUT)
+    text = ''
+    with requests.post(url, json=dict(payload, stream=True), stream=True, timeout=(10, idle_timeout)) as response:
+        if response.status_code != 200:
+            return None
+
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                piece = chunk.get('response', '')
+                text += piece
+                if chunk.get('done'):
+                    break
+
+                if max_chars and len(text) > max_chars:
+                    logger.warning(f"Ollama output exceeded {max_chars} chars, cancelling generation")
+                    return None
+                if time.monotonic() > deadline:
+                    logger.warning(f"Ollama generation exceeded {timeout}s, cancelling")
+                    return None
+                # Only re-check structure when a line has been finished
+                if '\n' in piece:
+                    if is_complete and is_complete(text):
+                        break
+                    recent = [l.strip() for l in text.split('\n')[-5:-1] if l.strip()]
+                    if len(recent) >= 3 and len(set(recent[-3:])) == 1:
+                        logger.warning("Ollama output is repeating itself, cancelling generation")
+                        return None
+        except requests.RequestException as e:
+            logger.warning(f"Ollama stream stalled for {idle_timeout}s, cancelling generation: {e}")
+            return None
+
+    return text
+
+
 class OllamaTranslator:
     """Translate VTT cues using Ollama local LLM."""
 
+    NUMBERED_LINE = re.compile(r'^\s*(\d+)[.)]\s*(.*)$')
+    PROMPT_OVERHEAD_TOKENS = 120  # translation instructions
+
     LANGUAGE_NAMES = {
         'es': 'Spanish',
         'pt': 'Portuguese'
     }
 
-    def __init__(self, config: dict, vtt_dir: str):
+    def __init__(self, config: dict, vtt_dir: str, journal: Optional[TranslationJournal] = None):
         self.enabled = config.get('enabled', True)
         self.model = config.get('model', 'qwen2.5:7b')
         self.host = config.get('host', 'http://localhost:11434')
         self.target_languages = config.get('target_languages', ['es', 'pt'])
-        self.batch_size = config.get('batch_size', 5)
+        self.context_tokens = config.get('context_tokens', 4096)
+        self.max_output_tokens = config.get('max_output_tokens', 1024)
+        self.batcher = TokenBudgetBatcher(
+            self.context_tokens,
+            self.max_output_tokens,
+            self.PROMPT_OVERHEAD_TOKENS,
+            config.get('max_batch_cues', 40)
+        )
         self.timeout = config.get('timeout', 120)
+        self.stream = config.get('stream', True)
         self.vtt_dir = vtt_dir
+        self.journal = journal
 
     def ensure_ollama_running(self) -> bool:
         """Check if Ollama is running, attempt to start if not."""
@@ -401,23 +976,25 @@ Text to translate:
 Translation:"""
 
         try:
-            response = requests.post(
-                f"{self.host}/api/generate",
-                json={
+            raw = ollama_generate(
+                self.host,
+                {
                     "model": self.model,
                     "prompt": prompt,
-                    "stream": False,
                     "options": {
                         "temperature": 0.3,
                         "num_predict": 256
                     }
                 },
-                timeout=self.timeout
+                self.timeout,
+                stream=self.stream,
+                # The translation is done once the model starts a second paragraph
+                is_complete=lambda out: '\n\n' in out.strip(),
+                max_chars=len(text) * 4 + 200
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                translation = result.get('response', '').strip()
+            if raw is not None:
+                translation = raw.strip().split('\n\n')[0].strip()
                 return translation if translation else None
 
         except Exception as e:
@@ -425,12 +1002,74 @@ Translation:"""
 
         return None
 
+    def _parse_numbered(self, raw: str, expected: int) -> Dict[int, str]:
+        """Map 1-based line numbers to text from a numbered LLM response."""
+        lines = {}
+        for line in raw.split('\n'):
+            match = self.NUMBERED_LINE.match(line)
+            if match:
+                number, text = int(match.group(1)), match.group(2).strip()
+                if 1 <= number <= expected and text and number not in lines:
+                    lines[number] = text
+        return lines
+
     def translate_batch(self, cues: List[VttCue], target_lang: str) -> List[Tuple[VttCue, str]]:
-        """Translate a batch of cues, return list of (source_cue, translated_text)."""
-        results = []
+        """Translate a batch of cues in one request, return list of (source_cue, translated_text).
 
-        for cue in cues:
-            translation = self.translate_cue(cue.text, target_lang)
+        Cues missing from the numbered response are retried one by one instead
+        of being padded with the source text.
+        """
+        if len(cues) == 1:
+            translation = self.translate_cue(cues[0].text, target_lang)
+            return [(cues[0], translation)] if translation else []
+
+        lang_name = self.LANGUAGE_NAMES.get(target_lang, target_lang)
+        numbered = '\n'.join(f"{i + 1}. {cue.text}" for i, cue in enumerate(cues))
+
+        prompt = f"""Translate the following numbered subtitle lines from English to {lang_name}.
+Keep each translation natural and conversational, suitable for subtitles.
+Output exactly {len(cues)} lines, numbered the same way (1., 2., ...), and nothing else.
+
+Lines to translate:
+{numbered}
+
+Translations:"""
+
+        expected = len(cues)
+
+        def all_lines_done(out: str) -> bool:
+            # Ignore the trailing partial line; stop once line N is finished
+            return len(self._parse_numbered(out[:out.rfind('\n')], expected)) >= expected
+
+        lines = {}
+        try:
+            raw = ollama_generate(
+                self.host,
+                {
+                    "model": self.model,
+                    "prompt": prompt,
+                    "options": {
+                        "temperature": 0.3,
+                        "num_predict": self.max_output_tokens,
+                        "num_ctx": self.context_tokens
+                    }
+                },
+                self.timeout,
+                stream=self.stream,
+                is_complete=all_lines_done,
+                max_chars=sum(len(cue.text) for cue in cues) * 4 + 100 * expected
+            )
+            if raw is not None:
+                lines = self._parse_numbered(raw, expected)
+        except Exception as e:
+            logger.warning(f"Batch translation failed: {e}")
+
+        if len(lines) < len(cues):
+            logger.warning(f"Batch returned {len(lines)}/{len(cues)} lines, translating the rest individually")
+
+        results = []
+        for i, cue in enumerate(cues):
+            translation = lines.get(i + 1) or self.translate_cue(cue.text, target_lang)
             if translation:
                 results.append((cue, translation))
             else:
@@ -438,33 +1077,57 @@ Translation:"""
 
         return results
 
-    def translate_all(self, cues: List[VttCue], target_lang: str) -> Dict[int, str]:
-        """Translate all cues, return dict of {sequence_order: translated_text}."""
+    def translate_all(
+        self,
+        cues: List[VttCue],
+        target_lang: str,
+        item_id: Optional[int] = None,
+        existing: Optional[Dict[int, str]] = None
+    ) -> Dict[int, str]:
+        """Translate all cues, return dict of {sequence_order: translated_text}.
+
+        Args:
+            cues: Source cues
+            target_lang: Target language code
+            item_id: When given (and a journal is configured), each batch is
+                checkpointed and a previous partial run is resumed
+            existing: Translations already known (e.g. stored server-side)
+                for the current source text; those cues are not translated again
+        """
         if not self.enabled:
             logger.info("Ollama translation disabled")
             return {}
 
         lang_name = self.LANGUAGE_NAMES.get(target_lang, target_lang)
-        logger.info(f"Translating {len(cues)} cues to {lang_name}")
 
-        translations = {}
+        translations = dict(existing or {})
+        sources = {cue.sequence_order: cue.text for cue in cues}
+        use_journal = self.journal is not None and item_id is not None
+        if use_journal:
+            translations.update(self.journal.load(item_id, target_lang, sources))
+
+        pending = [cue for cue in cues if cue.sequence_order not in translations]
         total = len(cues)
+        if len(pending) < total:
+            logger.info(f"Resuming {lang_name}: {total - len(pending)}/{total} cues already translated")
+        logger.info(f"Translating {len(pending)} cues to {lang_name}")
 
-        for i in range(0, total, self.batch_size):
-            batch = cues[i:i + self.batch_size]
-            batch_num = (i // self.batch_size) + 1
-            total_batches = (total + self.batch_size - 1) // self.batch_size
+        bounds = self.batcher.pack([cue.text for cue in pending])
+        total_batches = len(bounds)
 
-            logger.info(f"Translating batch {batch_num}/{total_batches}")
+        for batch_num, (start, end) in enumerate(bounds, 1):
+            batch = pending[start:end]
 
-            for cue in batch:
-                translation = self.translate_cue(cue.text, target_lang)
-                if translation:
-                    translations[cue.sequence_order] = translation
+            logger.info(f"Translating batch {batch_num}/{total_batches} ({len(batch)} cues)")
 
-            # Small delay between batches to avoid overloading
-            if i + self.batch_size < total:
-                time.sleep(0.5)
+            batch_translations = {
+                cue.sequence_order: translation
+                for cue, translation in self.translate_batch(batch, target_lang)
+            }
+
+            translations.update(batch_translations)
+            if use_journal:
+                self.journal.append(item_id, target_lang, batch_translations, sources)
 
         logger.info(f"Translated {len(translations)}/{total} cues to {lang_name}")
         return translations
@@ -479,12 +1142,10 @@ Translation:"""
         """Save translated VTT file locally."""
         output_path = os.path.join(self.vtt_dir, f"{item_id}_{target_lang}.vtt")
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("WEBVTT\n\n")
-            for cue in source_cues:
-                if cue.sequence_order in translations:
-                    f.write(f"{cue.start_time} --> {cue.end_time}\n")
-                    f.write(f"{translations[cue.sequence_order]}\n\n")
+        write_vtt(output_path, (
+            (cue.start_ms, cue.end_ms, translations[cue.sequence_order])
+            for cue in source_cues if cue.sequence_order in translations
+        ))
 
         logger.info(f"Translated VTT saved: {output_path}")
         return output_path
@@ -493,13 +1154,36 @@ Translation:"""
 class OllamaSummarizer:
     """Generate summaries from text content using Ollama local LLM."""
 
+    # Bump whenever the prompts or the response parsing change, so cached
+    # summaries produced by the old templates are not reused
+    PROMPT_VERSION = 3
+
     def __init__(self, config: dict):
         self.enabled = config.get('summarizer_enabled', True)
         self.model = config.get('model', 'qwen2.5:7b')
         self.host = config.get('host', 'http://localhost:11434')
         self.timeout = config.get('summary_timeout', 180)
+        self.stream = config.get('stream', True)
+        self.context_tokens = config.get('context_tokens', 4096)
+        self.map_reduce = config.get('summary_map_reduce', True)
+        # Largest text summarized in one prompt: what fits in the context window
+        # next to the instructions and the 1024-token answer (~3 chars per token)
+        self.chunk_chars = config.get('summary_chunk_chars', max(2000, (self.context_tokens - 1024 - 300) * 3))
+        self.concurrency = config.get('summary_concurrency', 2)
+        self.local_keywords = config.get('local_keywords', True)
+        # Created on the first cached summary, not when summarization is off
+        self.cache_dir = config.get('summary_cache_dir', './summary_cache')
+        # Truncation limits, only used when map-reduce is disabled
         self.max_cues = config.get('max_cues_for_summary', 500)
         self.max_chars = config.get('max_chars_for_summary', 50000)
+        # Documents are never read past this; map-reduce over 500-page proceedings
+        # would otherwise cost hundreds of model calls
+        self.max_document_chars = config.get('max_document_chars_for_summary', 300000)
+
+    @property
+    def text_budget(self) -> int:
+        """Most characters of a document the summarizer will look at."""
+        return self.max_document_chars if self.map_reduce else self.max_chars
 
     def generate_summary(self, cues: List[VttCue], title: str = "") -> Optional[dict]:
         """Generate structured summary from VTT cues.
@@ -509,7 +1193,8 @@ class OllamaSummarizer:
         if not self.enabled:
             return None
 
-        transcript = " ".join(c.text for c in cues[:self.max_cues])
+        summary_cues = cues if self.map_reduce else cues[:self.max_cues]
+        transcript = " ".join(c.text for c in summary_cues)
         return self.generate_summary_from_text(transcript, title, content_type="video transcript")
 
     def generate_summary_from_text(self, text: str, title: str = "", content_type: str = "document") -> Optional[dict]:
@@ -525,29 +1210,209 @@ class OllamaSummarizer:
         if not self.enabled:
             return None
 
-        # Truncate text if too long
-        truncated_text = text[:self.max_chars]
-        prompt = self._build_prompt(truncated_text, title, content_type)
+        cache_path = self._cache_path(text, content_type)
+        cached = self._load_cached(cache_path)
+        if cached:
+            logger.info(f"Using cached summary ({os.path.basename(cache_path)})")
+            return cached
+
+        if self.map_reduce:
+            if len(text) > self.chunk_chars:
+                summary = self._map_reduce(text, title, content_type)
+            else:
+                summary = self._summarize_structured(text, title, content_type)
+        else:
+            # Truncate text if too long
+            summary = self._summarize_structured(text[:self.max_chars], title, content_type)
+
+        if summary:
+            self._store_cached(cache_path, summary)
+        return summary
+
+    def _cache_path(self, text: str, content_type: str) -> str:
+        """Cache file for this input under the current model and prompt settings.
 
+        The title is left out of the key on purpose: download filenames carry the
+        item id, and identical documents mirrored under other ids should hit.
+        """
+        settings = json.dumps([
+            self.PROMPT_VERSION, self.model, content_type, self.local_keywords,
+            self.map_reduce, self.chunk_chars if self.map_reduce else self.max_chars
+        ])
+        digest = hashlib.sha256(settings.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return os.path.join(self.cache_dir, f"{digest.hexdigest()}.json")
+
+    def _load_cached(self, cache_path: str) -> Optional[dict]:
+        if not os.path.exists(cache_path):
+            return None
         try:
-            response = requests.post(
-                f"{self.host}/api/generate",
-                json={
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable summary cache {cache_path}: {e}")
+            return None
+
+    def _store_cached(self, cache_path: str, summary: dict):
+        tmp_path = cache_path + '.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache summary: {e}")
+
+    def _split_chunks(self, text: str, size: int) -> List[str]:
+        """Split text into chunks of at most `size` chars, preferring sentence breaks."""
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + size, len(text))
+            if end < len(text):
+                # Back up to the last sentence end, else whitespace, in the second half
+                window = text[start + size // 2:end]
+                cut = max(window.rfind('. '), window.rfind('? '), window.rfind('! '))
+                if cut == -1:
+                    cut = window.rfind(' ')
+                if cut != -1:
+                    end = start + size // 2 + cut + 1
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            start = end
+        return chunks
+
+    def _summarize_chunk(self, chunk: str, part: int, total: int, title: str, content_type: str) -> Optional[str]:
+        """Map step: free-form notes for one chunk."""
+        title_ctx = f"Title: {title}\n\n" if title else ""
+        prompt = f"""{title_ctx}This is part {part} of {total} of a {content_type}.
+Write concise notes (at most 200 words) on this part: main points, technical details,
+tools, projects, people and terms mentioned. Output only the notes.
+
+Content:
+{chunk}"""
+        try:
+            raw = ollama_generate(
+                self.host,
+                {
                     "model": self.model,
                     "prompt": prompt,
-                    "stream": False,
-                    "options": {"temperature": 0.3, "num_predict": 1024}
+                    "options": {"temperature": 0.3, "num_predict": 512, "num_ctx": self.context_tokens}
                 },
-                timeout=self.timeout
+                self.timeout,
+                stream=self.stream,
+                max_chars=512 * 8
             )
-            if response.status_code == 200:
-                return self._parse_response(response.json().get('response', ''))
+            return raw.strip() if raw and raw.strip() else None
+        except Exception as e:
+            logger.warning(f"Summary of part {part}/{total} failed: {e}")
+            return None
+
+    def _map_reduce(self, text: str, title: str, content_type: str) -> Optional[dict]:
+        """Summarize chunks concurrently, then reduce the notes into the final structure.
+
+        Notes that are still too long for one prompt are reduced again, level by level.
+        """
+        level = 1
+        while len(text) > self.chunk_chars:
+            chunks = self._split_chunks(text, self.chunk_chars)
+            total = len(chunks)
+            logger.info(f"Map-reduce summary level {level}: {total} chunks")
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                notes = list(pool.map(
+                    lambda args: self._summarize_chunk(args[1], args[0], total, title, content_type),
+                    enumerate(chunks, 1)
+                ))
+
+            parts = [f"[Part {i}]\n{n}" for i, n in enumerate(notes, 1) if n]
+            if not parts:
+                logger.error("All chunk summaries failed")
+                return None
+
+            reduced = "\n\n".join(parts)
+            if len(reduced) >= len(text):
+                # Notes are not getting shorter, stop recursing
+                reduced = reduced[:self.chunk_chars]
+            text = reduced
+            level += 1
+
+        return self._summarize_structured(text, title, f"{content_type} (given as notes on consecutive parts)")
+
+    def _summarize_structured(self, text: str, title: str, content_type: str) -> Optional[dict]:
+        """Single prompt producing the SHORT_SUMMARY/KEY_TOPICS/KEYWORDS/FULL_SUMMARY structure."""
+        prompt = self._build_prompt(text, title, content_type)
+
+        options = {"temperature": 0.3, "num_predict": 1024}
+        if self.map_reduce:
+            options["num_ctx"] = self.context_tokens
+
+        try:
+            raw = ollama_generate(
+                self.host,
+                {
+                    "model": self.model,
+                    "prompt": prompt,
+                    "options": options
+                },
+                self.timeout,
+                stream=self.stream,
+                is_complete=lambda out: self._full_summary_end(out) is not None,
+                max_chars=1024 * 8
+            )
+            if raw is not None:
+                end = self._full_summary_end(raw)
+                return self._parse_response(raw[:end] if end is not None else raw)
         except Exception as e:
             logger.error(f"Summary generation failed: {e}")
         return None
 
+    # Only the prompt's own section names (optionally in markdown bold or a
+    # heading) or a separator line end FULL_SUMMARY; "DEFCON: ..." does not
+    SECTION_HEADER = re.compile(
+        r'^[ \t]*(?:[#*]+[ \t]*)?(?:SHORT_SUMMARY|KEY_TOPICS|KEYWORDS|FULL_SUMMARY)\**:'
+        r'|^[ \t]*(?:-{3,}|\*{3,})[ \t]*$',
+        re.MULTILINE
+    )
+
+    def _full_summary_end(self, raw: str) -> Optional[int]:
+        """Index where text after a finished FULL_SUMMARY section starts, else None.
+
+        The section is complete once the model moves on to anything else, such as
+        a new header, a separator or a repeat of SHORT_SUMMARY.
+        """
+        marker = raw.find('FULL_SUMMARY:')
+        if marker == -1:
+            return None
+        body = raw[marker + len('FULL_SUMMARY:'):]
+        if not body.strip():
+            return None
+        content_start = len(raw) - len(body.lstrip())
+        match = self.SECTION_HEADER.search(raw, content_start + 1)
+        return match.start() if match else None
+
     def _build_prompt(self, text: str, title: str, content_type: str = "document") -> str:
         title_ctx = f"Title: {title}\n\n" if title else ""
+        if self.local_keywords:
+            # Keywords come from KeywordExtractor, the model only writes prose
+            return f"""{title_ctx}Analyze this {content_type} and provide:
+
+1. SHORT_SUMMARY: 1-2 sentences (max 200 chars) description
+2. KEY_TOPICS: 3-5 bullet points of main topics discussed
+3. FULL_SUMMARY: 2-3 paragraphs detailed overview
+
+Content:
+{text}
+
+Respond in this exact format:
+SHORT_SUMMARY: <text>
+KEY_TOPICS:
+- <topic>
+FULL_SUMMARY:
+<text>"""
+
         return f"""{title_ctx}Analyze this {content_type} and provide:
 
 1. SHORT_SUMMARY: 1-2 sentences (max 200 chars) description
@@ -597,6 +1462,167 @@ FULL_SUMMARY:
             return None
 
 
+class KeywordExtractor:
+    """Deterministic TF-IDF keyword extraction over the transcript/document corpus.
+
+    Document frequencies are kept incrementally, so each new item is scored
+    against everything processed before it. Like ProgressTracker, each added
+    document appends its terms to `<stats_file>.journal`; the JSON snapshot
+    is only rewritten every `compact_every` documents and on close().
+    """
+
+    # Unicode letters and digits, so accented Spanish/Portuguese words stay whole
+    TOKEN_RE = re.compile(r"[^\W_][\w+#]*(?:[-.][\w+#]+)*")
+    STOPWORDS = frozenset("""
+        a about above after again against all also am an and any are aren as at be because been before
+        being below between both but by can could did do does doing don down during each even every few
+        for from further get gets getting go goes going gonna got had has have having he her here hers
+        him his how i if in into is isn it its itself just know let like lot lots make many may me might
+        more most much must my no nor not now of off okay ok on once one only or other our ours out over
+        own pretty quite really right said same say says see she should so some something stuff such
+        than that thats the their them then there these they thing things think this those though
+        through to too two um uh under until up us use used using very want was way we well were what
+        when where which while who whom why will with would yeah yes you your yours actually basically
+        kind sort maybe mean means need needs look looks go went come came take took put give gave
+        really also still back first new good great sure lets thank thanks people time talk today
+        de la el en y los las del un una por con para es que se no al lo como mas pero sus le ya o este
+        si porque esta entre cuando muy sin sobre tambien me hasta hay donde quien desde todo nos
+        em da do dos das um uma os ao na no nas nos por mais mas foi ele ela isso esse essa
+        más está también según así aquí qué cómo cuándo dónde él sí
+        não são é à às já você também até então só após há será
+    """.split())
+    MAX_KEYWORDS = 15
+
+    def __init__(self, stats_file: str, max_keywords: int = MAX_KEYWORDS, compact_every: int = 200):
+        self.stats_file = stats_file
+        self.journal_file = stats_file + '.journal'
+        self.max_keywords = max_keywords
+        self.compact_every = compact_every
+        self.pending_entries = 0
+        self.stats = self._load()
+        self.doc_ids = set(self.stats['doc_ids'])
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+
+    def _load(self) -> dict:
+        stats = {'doc_count': 0, 'doc_ids': [], 'df': {}}
+        if os.path.exists(self.stats_file):
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                content = f.read()
+                complete = content.rfind(b'\n') + 1
+                if complete < len(content):
+                    # Torn last line from a crash mid-write
+                    f.truncate(complete)
+            seen = set(stats['doc_ids'])
+            for line in content[:complete].decode('utf-8', errors='replace').splitlines():
+                try:
+                    entry = json.loads(line)
+                    doc_id, terms = entry['id'], entry['terms']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.pending_entries += 1
+                # A crash between snapshot and journal truncate replays
+                # documents the snapshot already counts
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                self._count(stats, doc_id, terms)
+        return stats
+
+    @staticmethod
+    def _count(stats: dict, doc_id: str, terms: List[str]):
+        df = stats['df']
+        for term in terms:
+            df[term] = df.get(term, 0) + 1
+        stats['doc_ids'].append(doc_id)
+        stats['doc_count'] += 1
+
+    def compact(self):
+        """Write a fresh snapshot atomically, then empty the journal."""
+        tmp_path = self.stats_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.stats_file)
+        self._journal.truncate(0)
+        self._journal.seek(0)
+        self.pending_entries = 0
+
+    def close(self):
+        if self.pending_entries:
+            self.compact()
+        self._journal.close()
+
+    def _terms(self, text: str) -> List[str]:
+        """Unigrams and bigrams of non-stopword tokens."""
+        tokens = self.TOKEN_RE.findall(text.lower())
+        terms = []
+        prev = None
+        for token in tokens:
+            if token in self.STOPWORDS or len(token) < 3 or token.replace('.', '').isdigit():
+                prev = None
+                continue
+            terms.append(token)
+            if prev:
+                terms.append(f"{prev} {token}")
+            prev = token
+        return terms
+
+    def add_document(self, doc_id: str, text: str):
+        """Add a document's terms to the corpus statistics (once per doc_id)."""
+        if doc_id in self.doc_ids:
+            return
+        terms = sorted(set(self._terms(text)))
+        self._count(self.stats, doc_id, terms)
+        self.doc_ids.add(doc_id)
+
+        # Stats can be rebuilt, so flushing without fsync is enough here
+        self._journal.write(json.dumps({'id': doc_id, 'terms': terms}, ensure_ascii=False) + '\n')
+        self._journal.flush()
+        self.pending_entries += 1
+        if self.pending_entries >= self.compact_every:
+            self.compact()
+
+    def extract(self, text: str, doc_id: Optional[str] = None) -> List[str]:
+        """Return the top TF-IDF keywords of `text`.
+
+        When doc_id is given the document is first added to the corpus stats.
+        """
+        if doc_id is not None:
+            self.add_document(doc_id, text)
+
+        counts = Counter(self._terms(text))
+        if not counts:
+            return []
+
+        n_docs = self.stats['doc_count']
+        df = self.stats['df']
+        scored = []
+        for term, tf in counts.items():
+            is_bigram = ' ' in term
+            # A bigram said only once is usually noise
+            if is_bigram and tf < 2:
+                continue
+            idf = math.log((n_docs + 1) / (df.get(term, 0) + 1)) + 1
+            score = (1 + math.log(tf)) * idf * (1.5 if is_bigram else 1.0)
+            scored.append((-score, term))
+        scored.sort()
+
+        keywords = []
+        for _, term in scored:
+            # Skip words already covered by a chosen phrase and vice versa
+            if any(term in kw.split(' ') or kw in term.split(' ') for kw in keywords):
+                continue
+            keywords.append(term)
+            if len(keywords) >= self.max_keywords:
+                break
+        return keywords
+
+
 class PdfProcessor:
     """Extract text from PDF files using MarkItDown."""
 
@@ -605,7 +1631,12 @@ class PdfProcessor:
     def __init__(self, config: dict):
         self.md = MarkItDown()
         self.output_dir = config.get('pdf_output_dir', './pdf_extracts')
+        self.stream_pages = config.get('pdf_stream_pages', True)
         os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            self.converter_version = metadata.version('markitdown')
+        except metadata.PackageNotFoundError:
+            self.converter_version = 'unknown'
 
     @classmethod
     def is_supported(cls, filepath: str) -> bool:
@@ -613,9 +1644,10 @@ class PdfProcessor:
         ext = os.path.splitext(filepath)[1].lower()
         return ext in cls.SUPPORTED_EXTENSIONS
 
-    def extract_text(self, filepath: str) -> Optional[str]:
+    def extract_text(self, filepath: str, max_chars: Optional[int] = None) -> Optional[str]:
         """Extract text content from document.
 
+        With `max_chars`, PDFs and decks are read page by page up to that budget.
         Returns extracted text or None if extraction fails.
         """
         if not os.path.exists(filepath):
@@ -623,48 +1655,317 @@ class PdfProcessor:
             return None
 
         try:
+            cache_path = self.cache_path(filepath, max_chars)
+            cached = self.load_cached(cache_path)
+            if cached:
+                logger.info(f"Using cached extraction for {filepath} ({os.path.basename(cache_path)})")
+                return cached
+
             logger.info(f"Extracting text from: {filepath}")
-            result = self.md.convert(filepath)
-            text = result.text_content
+            text = read_document(filepath, self.md, self.effective_budget(max_chars))
+            return self.finish_extraction(filepath, text, cache_path)
 
-            if not text or not text.strip():
-                logger.warning(f"No text extracted from: {filepath}")
-                return None
+        except Exception as e:
+            logger.error(f"Text extraction failed for {filepath}: {e}")
+            return None
 
-            # Save extracted text for reference
-            self._save_extracted(filepath, text)
+    def effective_budget(self, max_chars: Optional[int]) -> Optional[int]:
+        """Character budget for page-wise reading; None means a full conversion."""
+        return max_chars if self.stream_pages else None
 
-            logger.info(f"Extracted {len(text)} chars from {filepath}")
-            return text
+    def cache_path(self, filepath: str, max_chars: Optional[int] = None) -> str:
+        """Extract file for this document's content under the current converter settings.
 
-        except Exception as e:
-            logger.error(f"Text extraction failed for {filepath}: {e}")
+        Keyed by file content rather than name, so reruns and identical
+        documents under other ids hit, and same-named files never collide.
+        """
+        settings = json.dumps([self.converter_version, self.effective_budget(max_chars)])
+        digest = hashlib.sha256(settings.encode('utf-8'))
+        digest.update(b'\0')
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return os.path.join(self.output_dir, f"{digest.hexdigest()}.md")
+
+    def load_cached(self, cache_path: str) -> Optional[str]:
+        if not os.path.exists(cache_path):
             return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read() or None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Ignoring unreadable extraction cache {cache_path}: {e}")
+            return None
+
+    def finish_extraction(self, filepath: str, text: Optional[str], cache_path: str) -> Optional[str]:
+        """Validate and cache converted text, whether converted inline or in a worker."""
+        if not text or not text.strip():
+            logger.warning(f"No text extracted from: {filepath}")
+            return None
+
+        self._save_extracted(cache_path, text)
+
+        logger.info(f"Extracted {len(text)} chars from {filepath}")
+        return text
 
-    def _save_extracted(self, source_path: str, text: str):
+    def _save_extracted(self, output_path: str, text: str):
         """Save extracted text to markdown file."""
-        basename = os.path.splitext(os.path.basename(source_path))[0]
-        output_path = os.path.join(self.output_dir, f"{basename}.md")
+        tmp_path = output_path + '.tmp'
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 f.write(text)
+            os.replace(tmp_path, output_path)
             logger.debug(f"Saved extracted text: {output_path}")
         except Exception as e:
             logger.warning(f"Failed to save extracted text: {e}")
 
 
+class DocumentExtractionPool:
+    """Convert documents in separate processes so they never block video work.
+
+    Each document gets its own worker process with a wall-clock timeout and a
+    heap (RLIMIT_DATA) limit; a stuck or runaway conversion is killed without
+    affecting the pipeline. Workers are spawned rather than forked, so they
+    start from a fresh interpreter instead of inheriting the pipeline's
+    address space, CUDA state and upload threads. Finished documents are
+    handed back in completion order through poll() and drain().
+    """
+
+    def __init__(self, pdf_processor: 'PdfProcessor', max_workers: int = 2,
+                 timeout: int = 600, memory_limit_mb: int = 4096,
+                 max_chars: Optional[int] = None):
+        self.pdf_processor = pdf_processor
+        self.max_chars = pdf_processor.effective_budget(max_chars)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.context = multiprocessing.get_context('spawn')
+        self.pending = deque()
+        self.running = {}
+        self.done = deque()
+
+    def submit(self, item_id: int, filepath: str):
+        """Queue a document for extraction."""
+        self.pending.append((item_id, filepath))
+        self._pump()
+
+    def __len__(self) -> int:
+        return len(self.pending) + len(self.running) + len(self.done)
+
+    def _pump(self):
+        """Collect finished/timed-out workers and start queued documents."""
+        now = time.monotonic()
+        for item_id, (proc, conn, filepath, cache_path, started) in list(self.running.items()):
+            text, error = None, None
+            if conn.poll():
+                try:
+                    status, payload = conn.recv()
+                except (EOFError, OSError) as e:
+                    status, payload = 'error', f"worker pipe closed: {e}"
+                if status == 'ok':
+                    text = payload
+                else:
+                    error = payload
+            elif not proc.is_alive():
+                error = f"worker exited with code {proc.exitcode}"
+            elif now - started > self.timeout:
+                proc.terminate()
+                error = f"timed out after {self.timeout}s"
+            else:
+                continue
+
+            proc.join(5)
+            conn.close()
+            del self.running[item_id]
+            if error:
+                logger.error(f"Text extraction failed for {filepath}: {error}")
+                self.done.append((item_id, filepath, None))
+            else:
+                self.done.append((item_id, filepath,
+                                  self.pdf_processor.finish_extraction(filepath, text, cache_path)))
+
+        while self.pending and len(self.running) < self.max_workers:
+            item_id, filepath = self.pending.popleft()
+            if not os.path.exists(filepath):
+                logger.error(f"File not found: {filepath}")
+                self.done.append((item_id, filepath, None))
+                continue
+            try:
+                cache_path = self.pdf_processor.cache_path(filepath, self.max_chars)
+            except OSError as e:
+                logger.error(f"Cannot read {filepath}: {e}")
+                self.done.append((item_id, filepath, None))
+                continue
+            cached = self.pdf_processor.load_cached(cache_path)
+            if cached:
+                logger.info(f"Using cached extraction for {filepath} ({os.path.basename(cache_path)})")
+                self.done.append((item_id, filepath, cached))
+                continue
+            logger.info(f"Extracting text from: {filepath} (worker)")
+            parent_conn, child_conn = self.context.Pipe(duplex=False)
+            proc = self.context.Process(
+                target=extraction_worker,
+                args=(filepath, self.max_chars, self.memory_limit_mb, child_conn),
+                daemon=True
+            )
+            proc.start()
+            child_conn.close()
+            self.running[item_id] = (proc, parent_conn, filepath, cache_path, time.monotonic())
+
+    def poll(self) -> List[Tuple[int, str, Optional[str]]]:
+        """Return (item_id, filepath, text_or_None) for documents finished so far."""
+        self._pump()
+        finished = list(self.done)
+        self.done.clear()
+        return finished
+
+    def drain(self) -> Iterator[Tuple[int, str, Optional[str]]]:
+        """Yield every remaining document as it finishes."""
+        while len(self):
+            finished = self.poll()
+            if not finished:
+                time.sleep(0.2)
+            yield from finished
+
+    def close(self):
+        """Kill any workers still running."""
+        for proc, conn, *_ in self.running.values():
+            proc.terminate()
+            conn.close()
+        self.running.clear()
+        self.pending.clear()
+
+
+class LatencyHistogram:
+    """Per-endpoint request latencies, counted in fixed millisecond buckets."""
+
+    BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints: Dict[str, Dict] = {}
+
+    def record(self, endpoint: str, seconds: float, error: bool = False):
+        elapsed_ms = seconds * 1000
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                'count': 0,
+                'errors': 0,
+                'total_ms': 0.0,
+                'buckets': [0] * (len(self.BUCKETS_MS) + 1)
+            })
+            stats['count'] += 1
+            stats['errors'] += error
+            stats['total_ms'] += elapsed_ms
+            stats['buckets'][bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, endpoint: str, fraction: float) -> Optional[int]:
+        """Upper bound in ms of the bucket holding the given fraction, None past the last bucket."""
+        stats = self.endpoints[endpoint]
+        target = fraction * stats['count']
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, stats['buckets']):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def summary(self) -> List[str]:
+        lines = []
+        for endpoint, stats in sorted(self.endpoints.items()):
+            quantiles = []
+            for label, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+                bound = self.percentile(endpoint, fraction)
+                quantiles.append(f"{label}<={bound}ms" if bound else f"{label}>{self.BUCKETS_MS[-1]}ms")
+            lines.append(
+                f"{endpoint}: {stats['count']} requests, {stats['errors']} errors, "
+                f"mean {stats['total_ms'] / stats['count']:.0f}ms, {' '.join(quantiles)}"
+            )
+        return lines
+
+
+def build_session(pool_size: int, retry: Retry) -> requests.Session:
+    """requests Session with a keep-alive connection pool and the given retry policy."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 class BackendClient:
-    """API client for submitting VTT cues to backend."""
+    """API client for submitting VTT cues to backend.
+
+    All calls share pooled keep-alive sessions. Retries happen in the
+    urllib3 adapter, with exponential backoff plus jitter and Retry-After
+    support. Plain calls retry only GETs and connection failures. A second
+    session also retries POST, for uploads safe to repeat: translation bulk
+    saves and summaries are upserts, and POST /api/vttcue answers a repeated
+    cue (same VttFileId and time range) with 409 Conflict, which add_cue
+    treats as already stored.
+    """
 
     MAX_RETRIES = 3
     BACKOFF_FACTOR = 2
+    BACKOFF_JITTER = 1.0
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # With gzip_requests, bodies larger than this are compressed. Off by
+    # default: the backend has no request decompression middleware.
+    GZIP_MIN_BYTES = 4096
 
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, pool_size: int = 10, gzip_requests: bool = False):
         self.base_url = base_url.rstrip('/')
         self.headers = {
             'X-API-Key': api_key,
             'Content-Type': 'application/json'
         }
+        self.gzip_requests = gzip_requests
+        self.latency = LatencyHistogram()
+        self.session = build_session(pool_size, self._retry(Retry.DEFAULT_ALLOWED_METHODS))
+        self.retry_session = build_session(pool_size, self._retry(Retry.DEFAULT_ALLOWED_METHODS | {'POST'}))
+
+    def _retry(self, methods) -> Retry:
+        options = dict(
+            total=self.MAX_RETRIES,
+            backoff_factor=self.BACKOFF_FACTOR,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(methods),
+            raise_on_status=False
+        )
+        try:
+            return Retry(backoff_jitter=self.BACKOFF_JITTER, **options)
+        except TypeError:
+            # urllib3 < 2 has no jitter option
+            return Retry(**options)
+
+    def _request(self, method: str, endpoint: str, url: str, payload=None, retry: bool = False,
+                 timeout: int = 30, **kwargs) -> requests.Response:
+        """Send a request on the pooled session, timing it under `endpoint`.
+
+        Status checks are left to the caller; retries are already included
+        in the recorded latency.
+        """
+        headers = self.headers
+        data = None
+        if payload is not None:
+            data = json.dumps(payload).encode('utf-8')
+            if self.gzip_requests and len(data) > self.GZIP_MIN_BYTES:
+                data = gzip.compress(data, compresslevel=5)
+                headers = dict(headers, **{'Content-Encoding': 'gzip'})
+
+        session = self.retry_session if retry else self.session
+        started = time.monotonic()
+        try:
+            response = session.request(method, url, data=data, headers=headers, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            self.latency.record(endpoint, time.monotonic() - started, error=True)
+            raise
+        self.latency.record(endpoint, time.monotonic() - started, error=response.status_code >= 400)
+        return response
+
+    def close(self):
+        self.session.close()
+        self.retry_session.close()
 
     def start_vtt(self, item_id: int, filename: str, language: str = "en") -> bool:
         """Start VTT build, mark as 'In Progress'."""
@@ -676,7 +1977,7 @@ class BackendClient:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = self._request('POST', 'POST /api/vttfile/start', url, payload)
             response.raise_for_status()
             logger.info(f"Started VTT build for ID {item_id}")
             return True
@@ -685,7 +1986,11 @@ class BackendClient:
             return False
 
     def add_cue(self, item_id: int, cue: VttCue) -> bool:
-        """Add individual cue to VTT file with retry logic."""
+        """Add individual cue to VTT file, retried by the session.
+
+        409 Conflict means the cue is already stored (e.g. a retried POST
+        whose first attempt reached the server), so it counts as success.
+        """
         url = f"{self.base_url}/api/vttcue"
         payload = {
             "VttFileId": item_id,
@@ -695,26 +2000,23 @@ class BackendClient:
             "SequenceOrder": cue.sequence_order
         }
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = requests.post(url, json=payload, headers=self.headers, timeout=30)
-                response.raise_for_status()
+        try:
+            response = self._request('POST', 'POST /api/vttcue', url, payload, retry=True)
+            if response.status_code == 409:
+                logger.debug(f"Cue {cue.sequence_order} already stored for ID {item_id}")
                 return True
-            except requests.RequestException as e:
-                logger.warning(f"Cue {cue.sequence_order} attempt {attempt + 1} failed: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    sleep_time = self.BACKOFF_FACTOR ** attempt
-                    time.sleep(sleep_time)
-
-        logger.error(f"Cue {cue.sequence_order} failed after {self.MAX_RETRIES} attempts")
-        return False
+            response.raise_for_status()
+            return True
+        except requests.RequestException as e:
+            logger.error(f"Cue {cue.sequence_order} failed after {self.MAX_RETRIES} retries: {e}")
+            return False
 
     def complete_vtt(self, item_id: int) -> bool:
         """Mark VTT as 'Completed'."""
         url = f"{self.base_url}/api/vttfile/completed/{item_id}"
 
         try:
-            response = requests.post(url, headers=self.headers, timeout=30)
+            response = self._request('POST', 'POST /api/vttfile/completed/{id}', url)
             response.raise_for_status()
             logger.info(f"Completed VTT for ID {item_id}")
             return True
@@ -757,7 +2059,7 @@ class BackendClient:
         payload = {"targetLanguage": target_language}
 
         try:
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            response = self._request('POST', 'POST /api/translate/{id}/start', url, payload)
             response.raise_for_status()
             data = response.json()
             target_vtt_id = data.get('targetVttFileId')
@@ -777,38 +2079,91 @@ class BackendClient:
         url = f"{self.base_url}/api/translate/{vtt_file_id}/cues/bulk"
         payload = {"cues": translations}
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = requests.post(url, json=payload, headers=self.headers, timeout=60)
-                response.raise_for_status()
-                logger.info(f"Submitted {len(translations)} translations to VTT {vtt_file_id}")
-                return True
-            except requests.RequestException as e:
-                logger.warning(f"Bulk submit attempt {attempt + 1} failed: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.BACKOFF_FACTOR ** attempt)
-
-        logger.error(f"Bulk submit failed after {self.MAX_RETRIES} attempts")
-        return False
+        try:
+            response = self._request(
+                'POST', 'POST /api/translate/{id}/cues/bulk', url, payload, retry=True, timeout=60
+            )
+            response.raise_for_status()
+            logger.info(f"Submitted {len(translations)} translations to VTT {vtt_file_id}")
+            return True
+        except requests.RequestException as e:
+            logger.error(f"Bulk submit failed after {self.MAX_RETRIES} retries: {e}")
+            return False
 
     def get_translation_progress(self, vtt_file_id: int) -> Optional[Dict]:
         """Get translation progress."""
         url = f"{self.base_url}/api/translate/{vtt_file_id}/progress"
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self._request('GET', 'GET /api/translate/{id}/progress', url)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             logger.error(f"Failed to get progress: {e}")
             return None
 
+    def get_existing_translations(
+        self,
+        file_id: int,
+        target_language: str,
+        sources: Dict[int, str],
+        page_size: int = 500
+    ) -> Dict[int, str]:
+        """Fetch cues already translated server-side.
+
+        The progress endpoint only reports counts, so this pages through
+        /api/translate/{fileId}/cues to learn which sequence orders are done.
+        A translation is only reused when the server's source text for that
+        sequence order still matches the local cue.
+
+        Args:
+            sources: {sequence_order: source_text} of the local cues
+
+        Returns:
+            Dict mapping sequence_order -> translated text (empty on error)
+        """
+        url = f"{self.base_url}/api/translate/{file_id}/cues"
+        existing = {}
+        stale = 0
+        page, total_pages = 1, 1
+
+        while page <= total_pages:
+            params = {"lang": target_language, "page": page, "pageSize": page_size}
+            try:
+                response = self._request('GET', 'GET /api/translate/{id}/cues', url, params=params)
+                if response.status_code == 404:
+                    return {}
+                response.raise_for_status()
+                data = response.json()
+            except requests.RequestException as e:
+                logger.warning(f"Failed to fetch existing translations: {e}")
+                return existing
+
+            for cue in data.get('cues', []):
+                text = cue.get('translatedText')
+                if not text:
+                    continue
+                seq = cue['sequenceOrder']
+                if seq in sources and (cue.get('sourceText') or '').strip() == sources[seq].strip():
+                    existing[seq] = text
+                else:
+                    stale += 1
+
+            total_pages = data.get('totalPages', 0)
+            page += 1
+
+        if stale:
+            logger.info(f"Ignoring {stale} {target_language} translations for file {file_id}: source cues changed")
+        if existing:
+            logger.info(f"Found {len(existing)} cues already translated to {target_language} for file {file_id}")
+        return existing
+
     def complete_translation(self, vtt_file_id: int) -> bool:
         """Mark translation as complete."""
         url = f"{self.base_url}/api/translate/{vtt_file_id}/complete"
 
         try:
-            response = requests.post(url, headers=self.headers, timeout=30)
+            response = self._request('POST', 'POST /api/translate/{id}/complete', url)
             response.raise_for_status()
             logger.info(f"Marked translation {vtt_file_id} as complete")
             return True
@@ -874,17 +2229,166 @@ class BackendClient:
             "generatedBy": "ollama"
         }
 
-        for attempt in range(self.MAX_RETRIES):
+        try:
+            response = self._request('POST', 'POST /api/summary', url, payload, retry=True)
+            response.raise_for_status()
+            logger.info(f"Summary submitted for file {file_id}")
+            return True
+        except requests.RequestException as e:
+            logger.warning(f"Summary submit failed after {self.MAX_RETRIES} retries: {e}")
+            return False
+
+
+class UploadQueue:
+    """Disk-backed queue of backend uploads, sent in the background.
+
+    An item's uploads (cues, translations, summary) are written to
+    `<queue_dir>/<item_id>.json` before anything is sent. They then run in
+    order on one of `max_workers` threads, so the main loop can move on to
+    the next item. The record notes each acknowledged upload and is
+    removed once the item is done. Records left by a crashed run are sent
+    again at startup, skipping what was already acknowledged.
+
+    Like DocumentExtractionPool, finished items are collected with poll()
+    and drain() so progress is only updated from the main thread.
+    """
+
+    def __init__(self, backend: 'BackendClient', queue_dir: str, max_workers: int = 4):
+        self.backend = backend
+        self.queue_dir = queue_dir
+        os.makedirs(self.queue_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='upload')
+        self.futures = {}  # item_id -> Future returning the finished record
+
+        for name in sorted(os.listdir(self.queue_dir)):
+            if not name.endswith('.json'):
+                continue
             try:
-                response = requests.post(url, json=payload, headers=self.headers, timeout=30)
-                response.raise_for_status()
-                logger.info(f"Summary submitted for file {file_id}")
-                return True
-            except requests.RequestException as e:
-                logger.warning(f"Summary submit attempt {attempt + 1} failed: {e}")
-                if attempt < self.MAX_RETRIES - 1:
-                    time.sleep(self.BACKOFF_FACTOR ** attempt)
-        return False
+                with open(os.path.join(self.queue_dir, name), 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable upload record {name}: {e}")
+                continue
+            logger.info(f"Resuming queued uploads for ID {record['item_id']}")
+            self.futures[record['item_id']] = self.executor.submit(self._upload, record)
+
+    def _path(self, item_id: int) -> str:
+        return os.path.join(self.queue_dir, f"{item_id}.json")
+
+    def _save(self, record: dict):
+        path = self._path(record['item_id'])
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def submit(
+        self,
+        item_id: int,
+        filename: str,
+        cues: Optional[List[VttCue]] = None,
+        translations: Optional[Dict[str, Dict[int, str]]] = None,
+        summary: Optional[dict] = None,
+        acked: Optional[List[str]] = None,
+        cleanup: Optional[List[str]] = None
+    ):
+        """Persist an item's uploads and queue them.
+
+        Args:
+            item_id: Item ID
+            filename: Original file name, sent when the VTT build starts
+            cues: Source cues; also needed to submit translations
+            translations: {language: {sequence_order: text}}
+            summary: Summary dict for submit_summary
+            acked: Stages a previous run already submitted (e.g. 'submitted')
+            cleanup: [file_path, audio_path] to remove once uploads are done
+        """
+        record = {
+            'item_id': item_id,
+            'filename': filename,
+            'cues': [[c.start_ms, c.end_ms, c.text, c.sequence_order] for c in cues] if cues else None,
+            'translations': {
+                lang: {str(seq): text for seq, text in texts.items()}
+                for lang, texts in (translations or {}).items()
+            },
+            'summary': summary,
+            'acked': list(acked or []),
+            'cleanup': cleanup
+        }
+        self._save(record)
+        self.futures[item_id] = self.executor.submit(self._upload, record)
+
+    def _upload(self, record: dict) -> dict:
+        """Send one item's uploads in order, recording each acknowledgement.
+
+        Returns the record with 'error' set when the cues were rejected; the
+        record file is then removed so a rerun starts the item over. An
+        unexpected exception keeps the file for the next run.
+        """
+        item_id = record['item_id']
+        acked = record['acked']
+        cues = [VttCue(*cue) for cue in record['cues']] if record['cues'] else None
+
+        def ack(stage: str):
+            acked.append(stage)
+            self._save(record)
+
+        try:
+            if cues and 'submitted' not in acked:
+                success, failed_cues = self.backend.submit_cues(item_id, cues, record['filename'])
+                if not success:
+                    if failed_cues:
+                        record['error'] = f"Cues failed after retries: {failed_cues}"
+                    else:
+                        record['error'] = "Backend submission failed"
+                    os.remove(self._path(item_id))
+                    return record
+                ack('submitted')
+
+            for target_lang, texts in record['translations'].items():
+                stage = f'translated:{target_lang}'
+                if stage in acked:
+                    continue
+                translations = {int(seq): text for seq, text in texts.items()}
+                if self.backend.submit_full_translation(item_id, cues, translations, target_lang):
+                    ack(stage)
+                    logger.info(f"Translation to {target_lang} complete for ID {item_id}")
+                else:
+                    logger.warning(f"Translation submission to {target_lang} failed for ID {item_id}")
+
+            if record['summary'] and 'summarized' not in acked:
+                if self.backend.submit_summary(item_id, record['summary']):
+                    ack('summarized')
+
+            os.remove(self._path(item_id))
+        except Exception as e:
+            logger.error(f"Uploads for ID {item_id} interrupted: {e}")
+            record['error'] = str(e)
+        return record
+
+    def poll(self) -> List[dict]:
+        """Return the records of items whose uploads have finished."""
+        done = [item_id for item_id, future in self.futures.items() if future.done()]
+        return [self.futures.pop(item_id).result() for item_id in done]
+
+    def drain(self) -> Iterator[dict]:
+        """Yield the remaining records as their uploads finish."""
+        while self.futures:
+            finished = self.poll()
+            if not finished:
+                time.sleep(0.2)
+            yield from finished
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self.futures
+
+    def __len__(self) -> int:
+        return len(self.futures)
 
 
 def parse_input_file(filepath: str) -> List[Tuple[int, str]]:
@@ -929,7 +2433,7 @@ def cleanup_temp_files(video_path: str, audio_path: str, keep_video: bool = True
         if not keep_video and os.path.exists(video_path):
             os.remove(video_path)
             logger.debug(f"Removed: {video_path}")
-        if not keep_audio and os.path.exists(audio_path):
+        if not keep_audio and audio_path and os.path.exists(audio_path):
             os.remove(audio_path)
             logger.debug(f"Removed: {audio_path}")
     except OSError as e:
@@ -982,14 +2486,31 @@ def main():
     progress = ProgressTracker(config.get('progress_file'))
     downloader = VideoDownloader(config.get('download_dir'))
     extractor = AudioExtractor(config.get('audio_dir'))
-    whisperx_proc = WhisperXProcessor(config.whisperx_config, config.get('vtt_dir'))
-    backend = BackendClient(config.get('base_url'), config.get('api_key'))
+    whisperx_proc = WhisperXProcessor(
+        config.whisperx_config, config.get('vtt_dir'), config.get('alignment_dir', './alignments')
+    )
+    backend = BackendClient(
+        config.get('base_url'),
+        config.get('api_key'),
+        pool_size=config.get('backend_pool_size', 10),
+        gzip_requests=config.get('backend_gzip', False)
+    )
+    # Uploads run in the background; items are marked processed once they are acknowledged
+    uploader = UploadQueue(backend, config.get('upload_queue_dir', './upload_queue'), config.get('upload_workers', 4))
 
     # Initialize Ollama translator and summarizer
     ollama_config = config.ollama_config
-    translator = OllamaTranslator(ollama_config, config.get('vtt_dir'))
+    journal = TranslationJournal(config.get('checkpoint_dir', './checkpoints'))
+    translator = OllamaTranslator(ollama_config, config.get('vtt_dir'), journal)
     pdf_processor = PdfProcessor(ollama_config)
     summarizer = OllamaSummarizer(ollama_config)
+    keyword_extractor = None
+    if ollama_config.get('local_keywords', True):
+        keyword_extractor = KeywordExtractor(config.get('keyword_stats_file', './keyword_stats.json'))
+    search_index = None
+    search_config = config.get('search_index', {})
+    if search_config.get('enabled', False):
+        search_index = open_index(search_config)
 
     # Check Ollama availability if enabled
     if ollama_config.get('enabled', True):
@@ -1006,22 +2527,110 @@ def main():
         logger.error("No valid items found in input file")
         sys.exit(1)
 
+    # Documents are converted in worker processes while videos are processed
+    document_workers = config.get('document_workers', 2)
+    extraction_pool = None
+    if document_workers > 0:
+        extraction_pool = DocumentExtractionPool(
+            pdf_processor,
+            max_workers=document_workers,
+            timeout=config.get('document_timeout', 600),
+            memory_limit_mb=config.get('document_memory_limit_mb', 4096),
+            max_chars=summarizer.text_budget
+        )
+
+    def index_item(item_id: int, chunks: list):
+        """Add an item to the local search index; indexing never fails the item."""
+        if not search_index or progress.stage_done(item_id, 'indexed'):
+            return
+        try:
+            search_index.add_item(item_id, chunks)
+            progress.mark_stage(item_id, 'indexed')
+            logger.info(f"Indexed {len(chunks)} chunks for ID {item_id}")
+        except Exception as e:
+            logger.warning(f"Search indexing failed for ID {item_id}: {e}")
+
+    def finish_document(item_id: int, file_path: str, text: Optional[str]) -> bool:
+        """Summarize extracted document text and queue the upload; False if extraction failed."""
+        if not text:
+            progress.mark_failed(item_id, "Text extraction failed")
+            return False
+
+        index_item(item_id, text_chunks(text))
+
+        # Generate summary + keywords from extracted text
+        summary = None
+        if ollama_config.get('summarizer_enabled', True):
+            try:
+                logger.info(f"Generating summary for document ID {item_id}")
+                summary = summarizer.generate_summary_from_text(
+                    text, os.path.basename(file_path), content_type="PDF document"
+                )
+                if summary:
+                    if keyword_extractor:
+                        summary['keywords'] = keyword_extractor.extract(text, str(item_id))
+                else:
+                    logger.warning(f"No summary generated for document ID {item_id}")
+            except Exception as e:
+                logger.error(f"Document summary generation failed: {e}")
+
+        uploader.submit(item_id, os.path.basename(file_path), summary=summary)
+        return True
+
+    def finish_upload(record: dict) -> bool:
+        """Record an item whose uploads finished; True if it is now processed."""
+        item_id = record['item_id']
+        for stage in record['acked']:
+            progress.mark_stage(item_id, stage)
+            if stage.startswith('translated:'):
+                journal.clear(item_id, stage.split(':', 1)[1])
+        if record.get('error'):
+            progress.mark_failed(item_id, record['error'])
+            return False
+
+        progress.mark_processed(item_id)
+        if record.get('cleanup'):
+            # Cleanup temp files (keep video by default)
+            cleanup_temp_files(*record['cleanup'], keep_video=config.get('keep_video', True))
+        return True
+
     # Process each item
     processed, skipped, failed = 0, 0, 0
 
     for item_id, url in items:
+        # Summarize any documents whose extraction finished in the background
+        if extraction_pool:
+            for doc_id, doc_path, text in extraction_pool.poll():
+                if not finish_document(doc_id, doc_path, text):
+                    failed += 1
+
+        # Record items whose uploads were acknowledged meanwhile
+        for record in uploader.poll():
+            if finish_upload(record):
+                processed += 1
+            else:
+                failed += 1
+
         if progress.is_processed(item_id):
             logger.info(f"Skipping {item_id}: already processed")
             skipped += 1
             continue
+        if item_id in uploader:
+            logger.info(f"Skipping {item_id}: uploads from a previous run are queued")
+            continue
 
         logger.info(f"Processing ID {item_id}: {url}")
         file_path = None
         audio_path = None
 
         try:
-            # Download file
-            file_path = downloader.download(url, item_id)
+            # Download file, unless a previous run already did
+            file_path = progress.stage_artifact(item_id, 'downloaded')
+            if file_path:
+                logger.info(f"Resuming ID {item_id} from downloaded file {file_path}")
+            else:
+                file_path = downloader.download(url, item_id)
+                progress.mark_stage(item_id, 'downloaded', file_path)
             filename = os.path.basename(file_path)
             file_type = get_file_type(file_path)
 
@@ -1029,105 +2638,132 @@ def main():
 
             if file_type == 'document':
                 # === DOCUMENT PROCESSING (PDF, DOCX, etc.) ===
-                text = pdf_processor.extract_text(file_path)
-
-                if not text:
-                    progress.mark_failed(item_id, "Text extraction failed")
-                    failed += 1
+                if extraction_pool:
+                    # Converted in a worker process; summarized once it finishes
+                    extraction_pool.submit(item_id, file_path)
                     continue
 
-                # Generate summary + keywords from extracted text
-                if ollama_config.get('summarizer_enabled', True):
-                    try:
-                        logger.info(f"Generating summary for document ID {item_id}")
-                        summary = summarizer.generate_summary_from_text(
-                            text, filename, content_type="PDF document"
-                        )
-                        if summary:
-                            backend.submit_summary(item_id, summary)
-                            logger.info(f"Summary submitted for document ID {item_id}")
-                        else:
-                            logger.warning(f"No summary generated for document ID {item_id}")
-                    except Exception as e:
-                        logger.error(f"Document summary generation failed: {e}")
-
-                progress.mark_processed(item_id)
-                processed += 1
+                text = pdf_processor.extract_text(file_path, max_chars=summarizer.text_budget)
+                if not finish_document(item_id, file_path, text):
+                    failed += 1
 
             else:
                 # === VIDEO PROCESSING ===
-                # Extract audio
-                audio_path = extractor.extract(file_path, item_id)
-
-                # Generate VTT
-                cues = whisperx_proc.process(audio_path, item_id)
-
-                # Submit to backend
-                success, failed_cues = backend.submit_cues(item_id, cues, filename)
-
-                if success:
-                    # Translation step (if Ollama enabled)
-                    if translator.enabled:
-                        for target_lang in translator.target_languages:
-                            try:
-                                logger.info(f"Translating ID {item_id} to {target_lang}")
-                                translations = translator.translate_all(cues, target_lang)
-
-                                if translations:
-                                    # Save translated VTT locally
-                                    translator.save_translated_vtt(cues, translations, item_id, target_lang)
-
-                                    # Submit to backend
-                                    trans_success = backend.submit_full_translation(
-                                        item_id, cues, translations, target_lang
-                                    )
-                                    if trans_success:
-                                        logger.info(f"Translation to {target_lang} complete for ID {item_id}")
-                                    else:
-                                        logger.warning(f"Translation submission to {target_lang} failed for ID {item_id}")
-                                else:
-                                    logger.warning(f"No translations generated for {target_lang}")
-
-                            except Exception as e:
-                                logger.error(f"Translation to {target_lang} failed: {e}")
-                                # Continue with other languages, don't fail the whole item
-
-                    # Summary generation (after translations)
-                    if ollama_config.get('summarizer_enabled', True):
+                # Each stage is skipped when a previous run already completed it
+                vtt_path = progress.stage_artifact(item_id, 'vtt')
+                if vtt_path:
+                    logger.info(f"Resuming ID {item_id} from {vtt_path}, skipping transcription")
+                    cues = whisperx_proc.load_vtt(vtt_path)
+                    audio_path = progress.stage_artifact(item_id, 'audio')
+                else:
+                    # Extract audio
+                    audio_path = progress.stage_artifact(item_id, 'audio')
+                    if not audio_path:
+                        audio_path = extractor.extract(file_path, item_id)
+                        progress.mark_stage(item_id, 'audio', audio_path)
+
+                    # Generate VTT
+                    cues = whisperx_proc.process(audio_path, item_id)
+                    progress.mark_stage(item_id, 'vtt', whisperx_proc.vtt_path(item_id))
+
+                index_item(item_id, cue_windows((c.start_ms, c.end_ms, c.text) for c in cues))
+
+                # Translation step (if Ollama enabled)
+                translations_by_lang = {}
+                if translator.enabled:
+                    for target_lang in translator.target_languages:
+                        if progress.stage_done(item_id, f'translated:{target_lang}'):
+                            logger.info(f"Translation to {target_lang} already submitted for ID {item_id}")
+                            continue
                         try:
-                            logger.info(f"Generating summary for ID {item_id}")
-                            summary = summarizer.generate_summary(cues, filename)
-                            if summary:
-                                backend.submit_summary(item_id, summary)
-                                logger.info(f"Summary submitted for ID {item_id}")
-                        except Exception as e:
-                            logger.error(f"Summary generation failed: {e}")
-                            # Don't fail whole item if summary fails
+                            logger.info(f"Translating ID {item_id} to {target_lang}")
+                            existing = backend.get_existing_translations(
+                                item_id, target_lang, {cue.sequence_order: cue.text for cue in cues}
+                            )
+                            translations = translator.translate_all(
+                                cues, target_lang, item_id=item_id, existing=existing
+                            )
+
+                            if translations:
+                                # Save translated VTT locally
+                                translator.save_translated_vtt(cues, translations, item_id, target_lang)
+                                translations_by_lang[target_lang] = translations
+                            else:
+                                logger.warning(f"No translations generated for {target_lang}")
 
-                    progress.mark_processed(item_id)
-                    processed += 1
+                        except Exception as e:
+                            logger.error(f"Translation to {target_lang} failed: {e}")
+                            # Continue with other languages, don't fail the whole item
 
-                    # Cleanup temp files (keep video by default)
-                    keep_video = config.get('keep_video', True)
-                    cleanup_temp_files(file_path, audio_path, keep_video=keep_video)
-                else:
-                    if failed_cues:
-                        reason = f"Cues failed after retries: {failed_cues}"
-                    else:
-                        reason = "Backend submission failed"
-                    progress.mark_failed(item_id, reason)
-                    failed += 1
+                # Summary generation (after translations)
+                summary = None
+                if ollama_config.get('summarizer_enabled', True) and not progress.stage_done(item_id, 'summarized'):
+                    try:
+                        logger.info(f"Generating summary for ID {item_id}")
+                        summary = summarizer.generate_summary(cues, filename)
+                        if summary and keyword_extractor:
+                            transcript = " ".join(c.text for c in cues)
+                            summary['keywords'] = keyword_extractor.extract(transcript, str(item_id))
+                    except Exception as e:
+                        logger.error(f"Summary generation failed: {e}")
+                        # Don't fail whole item if summary fails
+
+                # Queue cues, translations and summary for the backend and move on
+                uploader.submit(
+                    item_id,
+                    filename,
+                    cues,
+                    translations_by_lang,
+                    summary,
+                    acked=['submitted'] if progress.stage_done(item_id, 'submitted') else [],
+                    cleanup=[file_path, audio_path]
+                )
 
         except Exception as e:
             logger.error(f"Failed to process {item_id}: {e}")
             progress.mark_failed(item_id, str(e))
             failed += 1
 
+    # Wait for the remaining document extractions
+    if extraction_pool:
+        try:
+            for doc_id, doc_path, text in extraction_pool.drain():
+                if not finish_document(doc_id, doc_path, text):
+                    failed += 1
+        finally:
+            extraction_pool.close()
+
+    # Wait for the queued uploads
+    try:
+        for record in uploader.drain():
+            if finish_upload(record):
+                processed += 1
+            else:
+                failed += 1
+    finally:
+        uploader.close()
+
+    # Bring the keyword/phrase index up to date with this run's VTT files
+    fulltext_config = config.get('fulltext_index', {})
+    if fulltext_config.get('enabled', False):
+        try:
+            fulltext = FullTextIndex(fulltext_config.get('dir', './fulltext_index'))
+            indexed = fulltext.update(config.get('vtt_dir'))
+            logger.info(f"Full-text index updated: {indexed} VTT files (re)indexed")
+        except Exception as e:
+            logger.warning(f"Full-text index update failed: {e}")
+
     # Summary
     total_processed, total_failed = progress.get_stats()
+    progress.close()
+    if keyword_extractor:
+        keyword_extractor.close()
+    backend.close()
     logger.info(f"\n=== Pipeline Complete ===")
     logger.info(f"This run: {processed} processed, {skipped} skipped, {failed} failed")
     logger.info(f"Total: {total_processed} processed, {total_failed} failed")
+    for line in backend.latency.summary():
+        logger.info(f"Backend latency {line}")
 
 
 if __name__ == "__main__":
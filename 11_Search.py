@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Search the local index built by 09_Auto_Pipeline.py
+
+Usage:
+    python 11_Search.py "satellite hacking" [--k 10] [--config config.json]
+    python 11_Search.py --exact "Flipper Zero" [--k 50]
+    python 11_Search.py --reindex
+
+Semantic search prints one hit per line: item id, timestamp to jump to (and
+the same in milliseconds), similarity score and the matching text. Document
+hits have no timestamp.
+
+--exact finds a word or phrase in every transcript and translation in
+vtt_dir, printing item id, language, timestamp and cue. --reindex brings
+that full-text index, and the semantic index's transcripts, up to date
+first; only cue windows whose text changed are embedded again.
+"""
+
+import os
+import sys
+import json
+
+from search_index import open_index, cue_windows, FullTextIndex, VTT_NAME
+from vtt_io import format_timestamp, read_vtt
+
+
+def vtt_items(vtt_dir: str):
+    """(item_id, cue windows) for every source-language transcript in vtt_dir"""
+    for name in sorted(os.listdir(vtt_dir)):
+        match = VTT_NAME.match(name)
+        if match and not match.group(2):
+            yield int(match.group(1)), cue_windows(read_vtt(os.path.join(vtt_dir, name)))
+
+
+def exact_search(fulltext: FullTextIndex, query: str, limit: int):
+    cue_texts = {}
+    for hit in fulltext.search(query, limit):
+        if hit['path'] not in cue_texts:
+            try:
+                cue_texts[hit['path']] = read_vtt(hit['path']).texts
+            except OSError:
+                cue_texts[hit['path']] = []
+        texts = cue_texts[hit['path']]
+        text = texts[hit['cue'] - 1].replace('\n', ' ') if hit['cue'] <= len(texts) else ''
+        position = f"{format_timestamp(hit['start_ms'])} ({hit['start_ms']} ms)"
+        print(f"{hit['item_id']}\t{hit['lang'] or '-'}\t{position}\tcue {hit['cue']}\t{text}")
+
+
+def main():
+    args = sys.argv[1:]
+    config_path = "config.json"
+    k = None
+    exact = "--exact" in args
+    reindex = "--reindex" in args
+    args = [a for a in args if a not in ("--exact", "--reindex")]
+
+    if "--config" in args:
+        idx = args.index("--config")
+        config_path = args[idx + 1]
+        del args[idx:idx + 2]
+    if "--k" in args:
+        idx = args.index("--k")
+        k = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    config = {}
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+    if reindex or exact:
+        fulltext = FullTextIndex(config.get('fulltext_index', {}).get('dir', './fulltext_index'))
+        if reindex:
+            indexed = fulltext.update(config.get('vtt_dir', './vtt'))
+            print(f"Full-text index updated: {indexed} VTT files (re)indexed")
+    if reindex and config.get('search_index', {}).get('enabled', False):
+        embedded = open_index(config['search_index']).add_items(vtt_items(config.get('vtt_dir', './vtt')))
+        print(f"Semantic index updated: {embedded} cue windows embedded")
+
+    if not args:
+        if reindex:
+            return
+        print(__doc__)
+        sys.exit(1)
+    query = " ".join(args)
+
+    if exact:
+        exact_search(fulltext, query, k or 50)
+        return
+
+    index = open_index(config.get('search_index', {}))
+    for hit in index.search(query, k or 10):
+        if hit['start_ms'] >= 0:
+            position = f"{format_timestamp(hit['start_ms'])} ({hit['start_ms']} ms)"
+        else:
+            position = "document"
+        snippet = hit['text'] if len(hit['text']) <= 120 else hit['text'][:117] + "..."
+        print(f"{hit['item_id']}\t{position}\t{hit['score']:.3f}\t{snippet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Document-to-text conversion used by 09_Auto_Pipeline.py
+
+Kept apart from the pipeline so extraction worker processes, which are
+spawned fresh, only load the document parsers and never whisperx/torch.
+"""
+
+import os
+import logging
+from typing import Iterator, Optional
+
+from markitdown import MarkItDown
+
+logger = logging.getLogger(__name__)
+
+
+def iter_document_pages(filepath: str) -> Optional[Iterator[str]]:
+    """Yield text page by page (PDF) or slide by slide (PPTX).
+
+    Returns None for formats that cannot be read incrementally, or when the
+    parser library is missing; callers then fall back to a full MarkItDown pass.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+
+    if ext == '.pdf':
+        try:
+            from pdfminer.high_level import extract_pages
+            from pdfminer.layout import LTTextContainer
+        except ImportError:
+            return None
+
+        def pdf_pages():
+            for page in extract_pages(filepath):
+                yield "".join(el.get_text() for el in page if isinstance(el, LTTextContainer))
+        return pdf_pages()
+
+    if ext == '.pptx':
+        try:
+            from pptx import Presentation
+        except ImportError:
+            return None
+
+        def pptx_slides():
+            for number, slide in enumerate(Presentation(filepath).slides, 1):
+                parts = [f"<!-- Slide number: {number} -->"]
+                parts.extend(shape.text_frame.text for shape in slide.shapes if shape.has_text_frame)
+                if slide.has_notes_slide:
+                    notes = slide.notes_slide.notes_text_frame
+                    if notes is not None and notes.text.strip():
+                        parts.append(f"### Notes:\n{notes.text}")
+                yield "\n".join(parts) + "\n"
+        return pptx_slides()
+
+    return None
+
+
+def read_document(filepath: str, md: Optional['MarkItDown'] = None,
+                  max_chars: Optional[int] = None) -> Optional[str]:
+    """Convert a document to text, reading no more than `max_chars` when given.
+
+    With a budget, PDFs and decks are read page by page and reading stops as
+    soon as the budget is met, so large proceedings are never fully parsed.
+    """
+    pages = iter_document_pages(filepath) if max_chars else None
+    if pages is None:
+        text = (md or MarkItDown()).convert(filepath).text_content
+        return text[:max_chars] if max_chars and text else text
+
+    parts, total, count = [], 0, 0
+    try:
+        for page in pages:
+            parts.append(page)
+            total += len(page)
+            count += 1
+            if total >= max_chars:
+                logger.info(f"Stopped reading {filepath} after {count} pages ({max_chars} char budget)")
+                break
+    finally:
+        pages.close()
+    return "\n".join(parts)[:max_chars]
+
+
+def extraction_worker(filepath: str, max_chars: Optional[int], memory_limit_mb: int, conn):
+    """Child process entry point: convert one document and send back the text.
+
+    The heap is capped with RLIMIT_DATA rather than RLIMIT_AS: address space
+    also counts mapped libraries and reservations that never use memory.
+    """
+    try:
+        if memory_limit_mb:
+            try:
+                import resource
+                limit = memory_limit_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+            except (ImportError, ValueError, OSError):
+                pass  # Not supported on this platform (e.g. Windows)
+        conn.send(('ok', read_document(filepath, max_chars=max_chars)))
+    except MemoryError:
+        conn.send(('error', f"memory limit of {memory_limit_mb} MB exceeded"))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
@@ -0,0 +1,721 @@
+"""
+Local search indexes over transcripts and document extracts
+
+SemanticIndex embeds windows of consecutive cues and chunks of document
+text with a small CPU sentence-embedding model, and keeps everything on
+disk in its index directory:
+
+- vectors.f16       float16 rows, appended per item, memory-mapped for queries
+- rows.i64          (item_id, start_ms, end_ms) per row; documents use -1 timings
+- texts.jsonl       snippet per row, located through text_offsets.i64
+- keys.u64          hash of model id and text per row; rows already embedded
+                    are copied instead of re-embedded (embedding cache)
+- ivf.npz, assign.i32  IVF coarse quantizer (k-means centroids) and the list
+                    of every row, once the index is large enough
+- state.json        row count, model, row range of every item, deleted ranges
+
+state.json is replaced atomically after the data files are written, so rows
+left behind by a crashed add are ignored and overwritten by the next one.
+Re-indexing an item appends new rows and marks its old range deleted; an
+item whose chunks are unchanged is left alone.
+
+FullTextIndex is an inverted index over every VTT file in a folder, for
+exact keyword and phrase search. Each incremental update writes a new
+immutable segment: seg_N.post with varint-encoded postings, seg_N.lex with
+the segment's terms in sorted UTF-8 byte order, and seg_N.tix with one
+fixed-width (term offset, term length, postings offset, postings length)
+record per term. The term table and postings are memory-mapped once per
+index instance; queries binary-search the table.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from vtt_io import read_vtt
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+Chunk = Tuple[int, int, str]
+
+
+def cue_windows(cues: Iterable[Chunk], max_chars: int = 600, overlap_cues: int = 2) -> List[Chunk]:
+    """Group consecutive (start_ms, end_ms, text) cues into overlapping windows."""
+    cues = list(cues)
+    windows = []
+    i = 0
+    while i < len(cues):
+        j = i
+        length = 0
+        while j < len(cues) and (j == i or length + len(cues[j][2]) + 1 <= max_chars):
+            length += len(cues[j][2]) + 1
+            j += 1
+        text = ' '.join(cue[2] for cue in cues[i:j] if cue[2])
+        if text.strip():
+            windows.append((cues[i][0], cues[j - 1][1], text))
+        if j >= len(cues):
+            break
+        i = max(j - overlap_cues, i + 1)
+    return windows
+
+
+def text_chunks(text: str, max_chars: int = 1000) -> List[Chunk]:
+    """Split document text into paragraph-aligned chunks without timings."""
+    chunks = []
+    current = []
+    length = 0
+    for paragraph in text.split('\n\n'):
+        paragraph = ' '.join(paragraph.split())
+        if not paragraph:
+            continue
+        if current and length + len(paragraph) + 1 > max_chars:
+            chunks.append((-1, -1, ' '.join(current)))
+            current, length = [], 0
+        while len(paragraph) > max_chars:
+            chunks.append((-1, -1, paragraph[:max_chars]))
+            paragraph = paragraph[max_chars:]
+        current.append(paragraph)
+        length += len(paragraph) + 1
+    if current:
+        chunks.append((-1, -1, ' '.join(current)))
+    return chunks
+
+
+class SentenceEmbedder:
+    """Normalized sentence embeddings from a sentence-transformers model on CPU."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: str = 'cpu', batch_size: int = 64):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.model = None
+
+    def _load_model(self):
+        if self.model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise RuntimeError("Semantic search needs sentence-transformers: pip install sentence-transformers")
+            self.model = SentenceTransformer(self.model_name, device=self.device)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        self._load_model()
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class SemanticIndex:
+    """On-disk vector index with incremental per-item adds and an IVF quantizer."""
+
+    IVF_MIN_ROWS = 20000     # Below this, queries scan every row
+    IVF_RETRAIN_GROWTH = 2   # Retrain the centroids when the index has doubled
+    KMEANS_ITERATIONS = 10
+    SCAN_BLOCK_ROWS = 65536  # Rows scored per matrix product, bounds query memory
+    EMBED_ROW_BYTES = 1 << 20  # Rough model memory per text in an embedding batch
+    EMBED_BATCH_MAX = 8192
+
+    def __init__(self, index_dir: str, embedder: SentenceEmbedder, nprobe: int = 16):
+        self.index_dir = index_dir
+        self.embedder = embedder
+        self.nprobe = nprobe
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.state = self._load_state()
+        self._key_lookup = None  # (sorted keys, their rows, row count) for the embedding cache
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load_state(self) -> dict:
+        path = self._path('state.json')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {
+            'model': self.embedder.model_name,
+            'dim': None,
+            'count': 0,
+            'text_bytes': 0,
+            'items': {},
+            'deleted': [],
+            'ivf_rows': 0
+        }
+
+    def _save_state(self):
+        path = self._path('state.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_at(self, name: str, offset: int, data: bytes):
+        """Write at `offset`, dropping anything a crashed add left beyond it."""
+        path = self._path(name)
+        with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+            f.truncate(offset)
+            f.seek(offset)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add_item(self, item_id: int, chunks: List[Chunk]) -> int:
+        """Index an item's chunks, replacing whatever was indexed for it before."""
+        return self.add_items([(item_id, chunks)])
+
+    def add_items(self, items: Iterable[Tuple[int, List[Chunk]]]) -> int:
+        """
+        Index many items, embedding only chunks whose text is not in the index yet
+
+        Items are buffered until their uncached chunks fill one batch sized to
+        the available RAM, so a full re-index runs the model on large batches.
+        Returns the number of chunks embedded.
+        """
+        if self.state['model'] != self.embedder.model_name:
+            raise ValueError(
+                f"Index {self.index_dir} was built with {self.state['model']}, "
+                f"not {self.embedder.model_name}; rebuild it in a new directory"
+            )
+
+        batch_rows = self._embed_batch_rows()
+        embedded = 0
+        pending = []
+        missing = {}
+        for item_id, chunks in items:
+            keys = self._chunk_keys(chunks)
+            if self._unchanged(item_id, chunks, keys):
+                continue
+            cached = self._cached_rows(keys)
+            for key, row, (_, _, text) in zip(keys.tolist(), cached, chunks):
+                if row < 0:
+                    missing.setdefault(key, text)
+            pending.append((item_id, chunks, keys, cached))
+            if len(missing) >= batch_rows:
+                embedded += self._flush(pending, missing)
+                pending, missing = [], {}
+
+        if pending:
+            embedded += self._flush(pending, missing)
+        return embedded
+
+    def _embed_batch_rows(self) -> int:
+        try:
+            available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (ValueError, OSError, AttributeError):
+            return self.embedder.batch_size
+        rows = available // 4 // self.EMBED_ROW_BYTES
+        return int(max(self.embedder.batch_size, min(self.EMBED_BATCH_MAX, rows)))
+
+    def _chunk_keys(self, chunks: List[Chunk]) -> np.ndarray:
+        prefix = self.embedder.model_name.encode('utf-8') + b'\0'
+        return np.array([
+            int.from_bytes(hashlib.blake2b(prefix + text.encode('utf-8'), digest_size=8).digest(), 'little')
+            for _, _, text in chunks
+        ], dtype=np.uint64)
+
+    def _stored_keys(self) -> np.ndarray:
+        """Row keys on disk, one per row."""
+        if not self.state['count']:
+            return np.zeros(0, dtype=np.uint64)
+        return np.memmap(self._path('keys.u64'), dtype=np.uint64, mode='r', shape=(self.state['count'],))
+
+    def _unchanged(self, item_id: int, chunks: List[Chunk], keys: np.ndarray) -> bool:
+        previous = self.state['items'].get(str(item_id))
+        if not previous:
+            return not chunks
+        start, length = previous
+        if length != len(chunks):
+            return False
+        stored = self._stored_keys()[start:start + length]
+        if len(stored) != length or not np.array_equal(stored, keys):
+            return False
+        rows = np.memmap(self._path('rows.i64'), dtype=np.int64, mode='r', shape=(self.state['count'], 3))
+        timings = np.array([(start_ms, end_ms) for start_ms, end_ms, _ in chunks], dtype=np.int64)
+        return np.array_equal(rows[start:start + length, 1:], timings)
+
+    def _cached_rows(self, keys: np.ndarray) -> np.ndarray:
+        """Row already holding each key's vector, or -1."""
+        if self._key_lookup is None or self._key_lookup[2] != self.state['count']:
+            stored = np.asarray(self._stored_keys())
+            order = np.argsort(stored, kind='stable')
+            self._key_lookup = (stored[order], order, self.state['count'])
+
+        sorted_keys, key_rows, _ = self._key_lookup
+        if not len(sorted_keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        return np.where(sorted_keys[positions] == keys, key_rows[positions], -1)
+
+    def _flush(self, pending: list, missing: Dict[int, str]) -> int:
+        """Embed the missing texts in one batch, then append every pending item."""
+        dim = self.state['dim']
+        fresh = {}
+        if missing:
+            vectors = self.embedder.embed(list(missing.values())).astype(np.float16)
+            dim = dim or vectors.shape[1]
+            fresh = dict(zip(missing.keys(), vectors))
+
+        stored = self._vectors() if self.state['count'] else None
+        for item_id, chunks, keys, cached in pending:
+            previous = self.state['items'].pop(str(item_id), None)
+            if previous:
+                self.state['deleted'].append(previous)
+            if not chunks:
+                continue
+            vectors = np.empty((len(chunks), dim), dtype=np.float16)
+            hits = cached >= 0
+            if hits.any():
+                vectors[hits] = stored[cached[hits]]
+            for index in np.nonzero(~hits)[0]:
+                vectors[index] = fresh[int(keys[index])]
+            self._append_rows(item_id, chunks, vectors, keys)
+
+        self._save_state()
+        self._maybe_train_ivf()
+        return len(missing)
+
+    def _append_rows(self, item_id: int, chunks: List[Chunk], vectors: np.ndarray, keys: np.ndarray):
+        count = self.state['count']
+        dim = self.state['dim'] or vectors.shape[1]
+        self.state['dim'] = dim
+
+        rows = np.array([(item_id, start_ms, end_ms) for start_ms, end_ms, _ in chunks], dtype=np.int64)
+        lines = [(json.dumps(text, ensure_ascii=False) + '\n').encode('utf-8') for _, _, text in chunks]
+        offsets = np.zeros(len(lines), dtype=np.int64)
+        offsets[1:] = np.cumsum([len(line) for line in lines[:-1]])
+        offsets += self.state['text_bytes']
+
+        self._write_at('vectors.f16', count * dim * 2, vectors.tobytes())
+        self._write_at('rows.i64', count * 3 * 8, rows.tobytes())
+        self._write_at('text_offsets.i64', count * 8, offsets.tobytes())
+        self._write_at('keys.u64', count * 8, keys.tobytes())
+        self._write_at('texts.jsonl', self.state['text_bytes'], b''.join(lines))
+        if self.state['ivf_rows']:
+            self._write_at('assign.i32', count * 4, self._assign(vectors).tobytes())
+
+        self.state['items'][str(item_id)] = [count, len(chunks)]
+        self.state['count'] = count + len(chunks)
+        self.state['text_bytes'] += sum(len(line) for line in lines)
+
+    def _vectors(self) -> np.ndarray:
+        return np.memmap(self._path('vectors.f16'), dtype=np.float16, mode='r',
+                         shape=(self.state['count'], self.state['dim']))
+
+    def _alive(self) -> np.ndarray:
+        alive = np.ones(self.state['count'], dtype=bool)
+        for start, length in self.state['deleted']:
+            alive[start:start + length] = False
+        return alive
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        centroids = np.load(self._path('ivf.npz'))['centroids']
+        return np.argmax(vectors.astype(np.float32) @ centroids.T, axis=1).astype(np.int32)
+
+    def _maybe_train_ivf(self):
+        count = self.state['count']
+        if count < self.IVF_MIN_ROWS or count < self.state['ivf_rows'] * self.IVF_RETRAIN_GROWTH:
+            return
+
+        vectors = self._vectors()
+        n_lists = int(np.sqrt(count))
+        rng = np.random.default_rng(0)
+        sample = vectors[np.sort(rng.choice(count, size=min(count, n_lists * 64), replace=False))]
+        sample = sample.astype(np.float32)
+
+        # Spherical k-means: vectors are normalized, so similarity is a dot product
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(self.KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        np.savez(self._path('ivf.npz'), centroids=centroids)
+        assign = np.empty(count, dtype=np.int32)
+        for start in range(0, count, self.SCAN_BLOCK_ROWS):
+            assign[start:start + self.SCAN_BLOCK_ROWS] = self._assign(vectors[start:start + self.SCAN_BLOCK_ROWS])
+        self._write_at('assign.i32', 0, assign.tobytes())
+
+        self.state['ivf_rows'] = count
+        self._save_state()
+
+    def search(self, query: str, k: int = 10) -> List[Dict]:
+        """Return the k best rows as {item_id, start_ms, end_ms, score, text}."""
+        count = self.state['count']
+        if not count:
+            return []
+
+        q = self.embedder.embed([query])[0]
+        vectors = self._vectors()
+        alive = self._alive()
+
+        if self.state['ivf_rows']:
+            centroids = np.load(self._path('ivf.npz'))['centroids']
+            probes = np.argsort(centroids @ q)[-self.nprobe:]
+            assign = np.memmap(self._path('assign.i32'), dtype=np.int32, mode='r', shape=(count,))
+            candidates = np.nonzero(np.isin(assign, probes) & alive)[0]
+        else:
+            candidates = np.nonzero(alive)[0]
+        if not len(candidates):
+            return []
+
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), self.SCAN_BLOCK_ROWS):
+            block = candidates[start:start + self.SCAN_BLOCK_ROWS]
+            scores[start:start + len(block)] = vectors[block].astype(np.float32) @ q
+
+        best = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+        top = best[np.argsort(scores[best])[::-1]]
+
+        rows = np.memmap(self._path('rows.i64'), dtype=np.int64, mode='r', shape=(count, 3))
+        offsets = np.memmap(self._path('text_offsets.i64'), dtype=np.int64, mode='r', shape=(count,))
+        hits = []
+        with open(self._path('texts.jsonl'), 'rb') as texts:
+            for index in top:
+                row = int(candidates[index])
+                texts.seek(int(offsets[row]))
+                item_id, start_ms, end_ms = (int(v) for v in rows[row])
+                hits.append({
+                    'item_id': item_id,
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'score': float(scores[index]),
+                    'text': json.loads(texts.readline())
+                })
+        return hits
+
+    def indexed_items(self) -> List[int]:
+        return [int(key) for key in self.state['items']]
+
+
+def open_index(config: Optional[dict] = None) -> SemanticIndex:
+    """SemanticIndex from the pipeline's `search_index` config section."""
+    config = config or {}
+    embedder = SentenceEmbedder(
+        config.get('model', DEFAULT_MODEL),
+        device=config.get('device', 'cpu'),
+        batch_size=config.get('batch_size', 64)
+    )
+    return SemanticIndex(config.get('dir', './search_index'), embedder, nprobe=config.get('nprobe', 16))
+
+
+TOKEN = re.compile(r'\w+')
+VTT_NAME = re.compile(r'^(\d+)(?:_([A-Za-z-]+))?\.vtt$')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+def _put_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class FullTextIndex:
+    """Incremental inverted index over VTT files with phrase queries.
+
+    Postings of a term list, per document (VTT file), every occurrence as
+    (token position, cue number, cue start_ms), all delta- and varint-encoded:
+
+        doc_delta, payload_len, payload = count, (pos_delta, cue_delta, zigzag(start_delta)) * count
+
+    The payload length lets queries skip documents that cannot match without
+    decoding them. Changed or removed files are marked deleted; once there are
+    more than MAX_SEGMENTS segments, everything is rebuilt into one.
+    """
+
+    MAX_SEGMENTS = 8
+    TERM_RECORD = np.dtype([('term_off', '<u8'), ('term_len', '<u4'), ('post_off', '<u8'), ('post_len', '<u8')])
+    SEGMENT_FILES = ('.post', '.lex', '.tix')
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.state = self._load_state()
+        self._open_segments = {}  # name -> (term table, lex mmap, postings mmap)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_dir, name)
+
+    def _load_state(self) -> dict:
+        path = self._path('fulltext.json')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'next_doc': 0, 'next_segment': 0, 'segments': [], 'docs': {}}
+
+    def _save_state(self):
+        path = self._path('fulltext.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def update(self, vtt_dir: str) -> int:
+        """Index new and changed VTT files in `vtt_dir`, return how many were indexed."""
+        on_disk = {}
+        for entry in os.scandir(vtt_dir):
+            if entry.is_file() and entry.name.endswith('.vtt'):
+                stat = entry.stat()
+                on_disk[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+
+        live = {doc['path']: doc_id for doc_id, doc in self.state['docs'].items() if not doc['deleted']}
+        changed = []
+        for path, (mtime, size) in on_disk.items():
+            doc_id = live.get(path)
+            if doc_id is not None:
+                doc = self.state['docs'][doc_id]
+                if doc['mtime'] == mtime and doc['size'] == size:
+                    continue
+                doc['deleted'] = True
+            changed.append(path)
+        for path, doc_id in live.items():
+            if path not in on_disk:
+                self.state['docs'][doc_id]['deleted'] = True
+
+        if len(self.state['segments']) >= self.MAX_SEGMENTS and changed:
+            # Merge: rebuild every live document into a single segment
+            changed = sorted(set(changed) | {
+                doc['path'] for doc in self.state['docs'].values() if not doc['deleted']
+            })
+            for doc in self.state['docs'].values():
+                doc['deleted'] = True
+
+        if changed:
+            self._write_segment(sorted(changed), on_disk)
+        self._drop_dead_segments()
+        self._save_state()
+        return len(changed)
+
+    def _write_segment(self, paths: List[str], stats: Dict[str, Tuple[int, int]]):
+        name = f"seg_{self.state['next_segment']}"
+        self.state['next_segment'] += 1
+        blobs = {}
+        last_doc = {}
+
+        for path in paths:
+            try:
+                cues = read_vtt(path)
+            except OSError:
+                continue
+            doc_id = self.state['next_doc']
+            self.state['next_doc'] += 1
+            match = VTT_NAME.match(os.path.basename(path))
+            mtime, size = stats[path]
+            self.state['docs'][str(doc_id)] = {
+                'path': path,
+                'item_id': int(match.group(1)) if match else None,
+                'lang': match.group(2) if match else None,
+                'mtime': mtime,
+                'size': size,
+                'segment': name,
+                'deleted': False
+            }
+
+            occurrences = {}
+            position = 0
+            for cue, (start_ms, _, text) in enumerate(cues, 1):
+                for term in tokenize(text):
+                    occurrences.setdefault(term, []).append((position, cue, start_ms))
+                    position += 1
+
+            for term, hits in occurrences.items():
+                payload = bytearray()
+                _put_varint(payload, len(hits))
+                last_pos = last_cue = last_start = 0
+                for pos, cue, start_ms in hits:
+                    delta = start_ms - last_start
+                    _put_varint(payload, pos - last_pos)
+                    _put_varint(payload, cue - last_cue)
+                    _put_varint(payload, (delta << 1) ^ (delta >> 63))
+                    last_pos, last_cue, last_start = pos, cue, start_ms
+                blob = blobs.setdefault(term, bytearray())
+                _put_varint(blob, doc_id - last_doc.get(term, 0))
+                _put_varint(blob, len(payload))
+                blob += payload
+                last_doc[term] = doc_id
+
+        terms = {}
+        offset = 0
+        with open(self._path(name + '.post'), 'wb') as f:
+            for term in sorted(blobs):
+                f.write(blobs[term])
+                terms[term] = (offset, len(blobs[term]))
+                offset += len(blobs[term])
+            f.flush()
+            os.fsync(f.fileno())
+        self._write_term_table(name, terms)
+        self.state['segments'].append(name)
+
+    def _write_term_table(self, name: str, terms: Dict[str, Tuple[int, int]]):
+        """Write seg_N.lex and seg_N.tix, sorted by UTF-8 bytes for binary search."""
+        encoded = sorted((term.encode('utf-8'), ranges) for term, ranges in terms.items())
+        table = np.zeros(len(encoded), dtype=self.TERM_RECORD)
+        offset = 0
+        with open(self._path(name + '.lex'), 'wb') as f:
+            for i, (term, (post_off, post_len)) in enumerate(encoded):
+                f.write(term)
+                table[i] = (offset, len(term), post_off, post_len)
+                offset += len(term)
+        with open(self._path(name + '.tix'), 'wb') as f:
+            f.write(table.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _segment(self, name: str):
+        """(term table, lex, postings) of a segment, mapped on first use."""
+        if name not in self._open_segments:
+            maps = []
+            for suffix in ('.lex', '.post'):
+                with open(self._path(name + suffix), 'rb') as f:
+                    # mmap cannot map an empty file
+                    maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b'')
+            if os.path.getsize(self._path(name + '.tix')):
+                table = np.memmap(self._path(name + '.tix'), dtype=self.TERM_RECORD, mode='r')
+            else:
+                table = np.zeros(0, dtype=self.TERM_RECORD)
+            self._open_segments[name] = (table, maps[0], maps[1])
+        return self._open_segments[name]
+
+    @staticmethod
+    def _find_term(table: np.ndarray, lex, term: bytes) -> Optional[Tuple[int, int]]:
+        """Binary-search the term table, return the term's postings range."""
+        lo, hi = 0, len(table)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(table['term_off'][mid])
+            candidate = lex[start:start + int(table['term_len'][mid])]
+            if candidate < term:
+                lo = mid + 1
+            elif candidate > term:
+                hi = mid
+            else:
+                return int(table['post_off'][mid]), int(table['post_len'][mid])
+        return None
+
+    def close(self):
+        for _, lex, postings in self._open_segments.values():
+            for buf in (lex, postings):
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+        self._open_segments.clear()
+
+    def _drop_dead_segments(self):
+        in_use = {doc['segment'] for doc in self.state['docs'].values() if not doc['deleted']}
+        for name in [n for n in self.state['segments'] if n not in in_use]:
+            self.state['segments'].remove(name)
+            segment = self._open_segments.pop(name, None)
+            if segment:
+                for buf in segment[1:]:
+                    if isinstance(buf, mmap.mmap):
+                        buf.close()
+            for suffix in self.SEGMENT_FILES:
+                if os.path.exists(self._path(name + suffix)):
+                    os.remove(self._path(name + suffix))
+        self.state['docs'] = {
+            doc_id: doc for doc_id, doc in self.state['docs'].items() if doc['segment'] in self.state['segments']
+        }
+
+    @staticmethod
+    def _read_postings(buf, start: int, length: int, docs: Optional[set] = None) -> Dict[int, List[Tuple]]:
+        """Decode a term's postings, skipping documents not in `docs` when given."""
+        postings = {}
+        pos = start
+        end = start + length
+        doc_id = 0
+        while pos < end:
+            delta, pos = _get_varint(buf, pos)
+            size, pos = _get_varint(buf, pos)
+            doc_id += delta
+            if docs is not None and doc_id not in docs:
+                pos += size
+                continue
+            count, pos = _get_varint(buf, pos)
+            hits = []
+            token = cue = start_ms = 0
+            for _ in range(count):
+                value, pos = _get_varint(buf, pos)
+                token += value
+                value, pos = _get_varint(buf, pos)
+                cue += value
+                value, pos = _get_varint(buf, pos)
+                start_ms += (value >> 1) ^ -(value & 1)
+                hits.append((token, cue, start_ms))
+            postings[doc_id] = hits
+        return postings
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """Find a word or phrase; each hit has the file, item id, language, cue and start_ms."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        unique = sorted(set(terms))
+        hits = []
+        for name in self.state['segments']:
+            table, lex, buf = self._segment(name)
+            ranges = [self._find_term(table, lex, term.encode('utf-8')) for term in unique]
+            if None in ranges:
+                continue
+            term_ranges = dict(zip(unique, ranges))
+
+            # Start from the rarest term, then only decode documents still in play
+            decoded = {}
+            docs = None
+            for term in sorted(unique, key=lambda t: term_ranges[t][1]):
+                decoded[term] = self._read_postings(buf, *term_ranges[term], docs)
+                docs = set(decoded[term])
+                if not docs:
+                    break
+            if not docs:
+                continue
+
+            for doc_id in sorted(docs):
+                doc = self.state['docs'][str(doc_id)]
+                if doc['deleted']:
+                    continue
+                following = [
+                    {token for token, _, _ in decoded[term][doc_id]} for term in terms[1:]
+                ]
+                for token, cue, start_ms in decoded[terms[0]][doc_id]:
+                    if all(token + i + 1 in positions for i, positions in enumerate(following)):
+                        hits.append({
+                            'path': doc['path'],
+                            'item_id': doc['item_id'],
+                            'lang': doc['lang'],
+                            'cue': cue,
+                            'start_ms': start_ms
+                        })
+                        if len(hits) >= limit:
+                            return hits
+        return hits
@@ -0,0 +1,57 @@
+"""
+Token-budget batching shared by the OpenAI (06_Translation.py) and Ollama
+(09_Auto_Pipeline.py) translators
+"""
+
+from typing import List, Tuple
+
+
+class TokenBudgetBatcher:
+    """Pack consecutive cue texts into batches by estimated token count.
+
+    Each batch fills the model's context close to capacity while keeping the
+    expected translated output under the completion budget (max_tokens /
+    num_predict). `prompt_overhead_tokens` is what the caller's instructions
+    and system message take up in every request.
+    """
+
+    CHARS_PER_TOKEN = 4
+    LINE_OVERHEAD_TOKENS = 4  # numbering ("12. ") and newline
+    OUTPUT_RATIO = 1.3  # translations run somewhat longer than the source
+    FILL_RATIO = 0.9  # headroom for estimation error
+
+    def __init__(self, context_tokens: int, output_tokens: int, prompt_overhead_tokens: int,
+                 max_items: int = 100):
+        self.output_budget = int(output_tokens * self.FILL_RATIO)
+        self.input_budget = int((context_tokens - output_tokens - prompt_overhead_tokens) * self.FILL_RATIO)
+        self.max_items = max_items
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    def pack(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """Return (start, end) slice bounds of consecutive batches, in order."""
+        batches = []
+        start = 0
+        input_used = output_used = 0
+
+        for i, text in enumerate(texts):
+            tokens = self.estimate_tokens(text) + self.LINE_OVERHEAD_TOKENS
+            output_tokens = int(tokens * self.OUTPUT_RATIO)
+            full = (
+                input_used + tokens > self.input_budget
+                or output_used + output_tokens > self.output_budget
+                or i - start >= self.max_items
+            )
+            # A single oversized text still gets a batch of its own
+            if full and i > start:
+                batches.append((start, i))
+                start = i
+                input_used = output_used = 0
+            input_used += tokens
+            output_used += output_tokens
+
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        return batches
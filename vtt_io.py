@@ -0,0 +1,181 @@
+"""
+Shared WebVTT reading and writing
+
+Used by the transcription, polishing, translation and pipeline scripts so
+there is one parser and one writer to maintain.
+
+- Cues are kept columnar: start/end milliseconds in typed arrays and the
+  texts in a plain list, instead of one dict or object per cue.
+- Parsing is a single pass over the file's lines with precompiled patterns,
+  so files are streamed rather than read and split in memory.
+- Timestamps are integer milliseconds everywhere; they are formatted only
+  when written.
+"""
+
+import re
+from array import array
+from typing import Iterable, Iterator, Optional, Tuple
+
+TIMING_LINE = re.compile(
+    r'((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})'
+)
+TAG = re.compile(r'<[^>]*>')
+
+
+def parse_timestamp(value: str) -> int:
+    """Convert 'HH:MM:SS.mmm' (hours optional, ',' accepted) to milliseconds."""
+    clock, _, millis = value.strip().replace(',', '.').rpartition('.')
+    total = 0
+    for part in clock.split(':'):
+        total = total * 60 + int(part)
+    return total * 1000 + int(millis)
+
+
+def format_timestamp(ms: int) -> str:
+    """Convert milliseconds to VTT time format (HH:MM:SS.mmm)."""
+    hours, rest = divmod(int(ms), 3600000)
+    minutes, rest = divmod(rest, 60000)
+    seconds, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def seconds_to_ms(seconds: float) -> int:
+    """Convert a WhisperX float timestamp to milliseconds."""
+    return int(round(seconds * 1000))
+
+
+class CueTable:
+    """Columnar cue storage: start/end milliseconds in arrays, texts in a list.
+
+    Iterating yields (start_ms, end_ms, text) tuples; slicing returns a new table.
+    """
+
+    __slots__ = ('starts', 'ends', 'texts')
+
+    def __init__(self, starts: Iterable[int] = (), ends: Iterable[int] = (), texts: Iterable[str] = ()):
+        self.starts = array('q', starts)
+        self.ends = array('q', ends)
+        self.texts = list(texts)
+
+    def append(self, start_ms: int, end_ms: int, text: str):
+        self.starts.append(start_ms)
+        self.ends.append(end_ms)
+        self.texts.append(text)
+
+    def with_texts(self, texts: Iterable[str]) -> 'CueTable':
+        """Same timings with new texts, e.g. for a translation."""
+        table = CueTable(texts=texts)
+        table.starts = array('q', self.starts)
+        table.ends = array('q', self.ends)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, str]]:
+        return zip(self.starts, self.ends, self.texts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CueTable(self.starts[index], self.ends[index], self.texts[index])
+        return self.starts[index], self.ends[index], self.texts[index]
+
+
+def iter_cues(lines: Iterable[str], strip_tags: bool = False, joiner: str = '\n',
+              skip_empty: bool = False) -> Iterator[Tuple[int, int, str]]:
+    """Yield (start_ms, end_ms, text) from VTT lines in a single pass.
+
+    Args:
+        lines: VTT lines, e.g. an open file
+        strip_tags: Remove <v Speaker>, <i> and other markup from the text
+        joiner: String used to join multi-line cue text
+        skip_empty: Drop cues without text
+    """
+    timing = None
+    text_lines = []
+    for line in lines:
+        line = line.strip()
+        if timing is None:
+            if '-->' in line:
+                match = TIMING_LINE.search(line)
+                if match:
+                    timing = (parse_timestamp(match.group(1)), parse_timestamp(match.group(2)))
+            continue
+
+        if line:
+            if strip_tags and '<' in line:
+                line = TAG.sub('', line).strip()
+                if not line:
+                    continue
+            text_lines.append(line)
+            continue
+
+        if text_lines or not skip_empty:
+            yield timing[0], timing[1], joiner.join(text_lines)
+        timing = None
+        text_lines = []
+
+    if timing is not None and (text_lines or not skip_empty):
+        yield timing[0], timing[1], joiner.join(text_lines)
+
+
+def parse_vtt(content: str, **options) -> CueTable:
+    """Parse VTT content already in memory; options as for iter_cues."""
+    table = CueTable()
+    for start_ms, end_ms, text in iter_cues(content.splitlines(), **options):
+        table.append(start_ms, end_ms, text)
+    return table
+
+
+def read_vtt(path: str, **options) -> CueTable:
+    """Parse a VTT file line by line, falling back to latin-1 for legacy encodings."""
+    try:
+        return _read_vtt(path, 'utf-8', options)
+    except UnicodeDecodeError:
+        return _read_vtt(path, 'latin-1', options)
+
+
+def _read_vtt(path: str, encoding: str, options: dict) -> CueTable:
+    table = CueTable()
+    with open(path, 'r', encoding=encoding) as f:
+        for start_ms, end_ms, text in iter_cues(f, **options):
+            table.append(start_ms, end_ms, text)
+    return table
+
+
+class VttWriter:
+    """Write cues to a VTT file as they are produced.
+
+    Usage:
+        with VttWriter(path) as writer:
+            writer.write(start_ms, end_ms, text)
+    """
+
+    def __init__(self, path: str, numbered: bool = False):
+        self.path = path
+        self.numbered = numbered
+        self.count = 0
+        self.file = None
+
+    def __enter__(self) -> 'VttWriter':
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.file.write("WEBVTT\n\n")
+        return self
+
+    def write(self, start_ms: int, end_ms: int, text: str, identifier: Optional[str] = None):
+        self.count += 1
+        if identifier is None and self.numbered:
+            identifier = str(self.count)
+        prefix = f"{identifier}\n" if identifier else ""
+        self.file.write(f"{prefix}{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}\n{text}\n\n")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+
+
+def write_vtt(path: str, cues: Iterable[Tuple[int, int, str]], numbered: bool = False) -> int:
+    """Write (start_ms, end_ms, text) cues to a VTT file, return the cue count."""
+    with VttWriter(path, numbered) as writer:
+        for start_ms, end_ms, text in cues:
+            writer.write(start_ms, end_ms, text)
+    return writer.count